@@ -0,0 +1 @@
+"""汽车数据爬虫工具集。"""
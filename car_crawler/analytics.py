@@ -0,0 +1,649 @@
+"""跨数据源分析：销量、投诉、召回按品牌 / 车系 / 月份关联。
+
+三个站点的品牌和车系写法不一致（“小鹏汽车”/“小鹏”、“一汽-大众”/“大众”、
+“小鹏P7”/“P7”），先通过 :class:`AliasIndex` 归一为统一名称再关联。
+别名索引由内置别名、用户别名文件和历次见过的名称组成，保存在缓存库中。
+
+计算分三层，结果都缓存在 SQLite（默认 ``out/analytics.sqlite3``）：
+
+1. 每个输入文件（分区输出中的每个分区文件）读出后只保留编号、品牌、车系、
+   月份、销量等少数列，按文件缓存；文件未变化（大小和修改时间相同）时不再读取；
+2. 按（数据源, 月份）分区聚合：去重（同一投诉、同一车型同月销量在多次抓取中
+   重复出现）后统计投诉数、召回数和销量。只重算新增或变化的文件涉及的月份；
+3. 用 pandas / NumPy 在聚合结果上关联三个数据源，计算每万辆投诉、环比和趋势斜率。
+
+需要安装 pandas（``uv sync --extra analytics``）。
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import re
+import sqlite3
+from collections.abc import Iterable
+from dataclasses import dataclass, field
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from . import recall, sales, zlts
+from .output import OUT_DIR
+
+DEFAULT_PATH = OUT_DIR / "analytics.sqlite3"
+LEVELS = ("brand", "series")
+
+
+@dataclass(frozen=True)
+class Source:
+    """一个数据源的输出文件前缀和分析用到的列。"""
+
+    name: str
+    prefix: str
+    brand: str
+    date: str
+    series: tuple[str, ...] = ()
+    key: tuple[str, ...] = ()
+    value: str = ""
+    title: str = ""
+
+
+SOURCES = {
+    "sales": Source(
+        name="sales",
+        prefix="销量排行",
+        brand=sales.BRAND_FIELD,
+        date=sales.DATE_FIELD,
+        # 销量榜的车系列常为空，车型列即车系
+        series=("车系", "车型"),
+        key=("车型",),
+        value="销量",
+    ),
+    "complaints": Source(
+        name="complaints",
+        prefix="投诉",
+        brand=zlts.BRAND_FIELD,
+        date=zlts.DATE_FIELD,
+        series=("投诉车系",),
+        key=("投诉编号",),
+    ),
+    "recalls": Source(
+        name="recalls",
+        prefix="召回新闻",
+        brand=recall.BRAND_FIELD,
+        date=recall.DATE_FIELD,
+        key=("详情链接", "新闻标题"),
+        title="新闻标题",
+    ),
+}
+DATA_SUFFIXES = (".csv", ".jsonl", ".parquet")
+
+# 合资、进口等常见写法 -> 统一品牌名；可用 --aliases 文件补充或覆盖
+BRAND_ALIASES: dict[str, list[str]] = {
+    "大众": ["一汽-大众", "一汽大众", "上汽大众", "大众(进口)"],
+    "奥迪": ["一汽-奥迪", "一汽奥迪", "上汽奥迪", "奥迪(进口)"],
+    "丰田": ["一汽丰田", "广汽丰田", "丰田(进口)"],
+    "本田": ["广汽本田", "东风本田"],
+    "日产": ["东风日产", "郑州日产"],
+    "奔驰": ["梅赛德斯-奔驰", "北京奔驰", "Mercedes-Benz", "奔驰(进口)"],
+    "宝马": ["华晨宝马", "BMW", "宝马(进口)"],
+    "别克": ["上汽通用别克"],
+    "雪佛兰": ["上汽通用雪佛兰"],
+    "凯迪拉克": ["上汽通用凯迪拉克"],
+    "福特": ["长安福特", "江铃福特"],
+    "马自达": ["长安马自达", "一汽马自达"],
+    "现代": ["北京现代"],
+    "起亚": ["东风悦达起亚"],
+    "特斯拉": ["Tesla", "特斯拉中国"],
+    "比亚迪": ["BYD"],
+    "小鹏": ["XPeng"],
+    "理想": ["Li Auto"],
+    "蔚来": ["NIO"],
+}
+
+_PUNCT = r"[\s\-_·・.,，。()（）\[\]【】/&'\"]+"
+_BRAND_SUFFIX = re.compile(r"(汽车股份有限公司|汽车有限公司|有限公司|汽车集团|集团|汽车|进口)+$")
+_MONTH = r"(\d{4})[-/.年](\d{1,2})"
+_NON_DIGIT = r"[^\d-]"
+UNKNOWN = "未知"
+
+
+def normalize(names: pd.Series) -> pd.Series:
+    """比较用的键：小写，去掉空白和标点。"""
+    return names.fillna("").astype(str).str.lower().str.replace(_PUNCT, "", regex=True)
+
+
+def brand_key(name: str) -> str:
+    return _BRAND_SUFFIX.sub("", normalize(pd.Series([name]))[0])
+
+
+def to_month(values: pd.Series) -> pd.Series:
+    """``2025-01-29``、``2025/1``、``2025年1月`` -> ``2025-01``，无法解析时为空。"""
+    parts = values.astype(str).str.extract(_MONTH)
+    month = pd.to_numeric(parts[1], errors="coerce")
+    valid = parts[0].notna() & month.between(1, 12)
+    result = parts[0] + "-" + parts[1].str.zfill(2)
+    return result.where(valid, "")
+
+
+def to_number(values: pd.Series) -> pd.Series:
+    """``12,345``、``1234辆`` -> 数值，无法解析时为 0。"""
+    if pd.api.types.is_numeric_dtype(values):
+        return values.fillna(0)
+    digits = values.astype(str).str.replace(_NON_DIGIT, "", regex=True)
+    return pd.to_numeric(digits, errors="coerce").fillna(0)
+
+
+ALIAS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS brand_aliases (
+    alias TEXT PRIMARY KEY,
+    canonical TEXT NOT NULL,
+    explicit INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS series_aliases (
+    brand TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    canonical TEXT NOT NULL,
+    explicit INTEGER NOT NULL DEFAULT 0,
+    PRIMARY KEY (brand, alias)
+);
+"""
+
+
+class AliasIndex:
+    """品牌 / 车系别名索引：归一化键 -> 统一名称。
+
+    键是去掉空白、标点（品牌还去掉“汽车”“有限公司”等后缀，车系去掉品牌前缀）
+    后的小写名称；没有显式别名的名称以第一次见到的写法为统一名称，并记入索引，
+    之后各数据源的同一名称都映射到它。显式别名（内置的和 ``extra`` 中的）
+    优先，其内容的哈希为 :attr:`version`，变化时需要重算所有聚合。
+    新收录了车系的品牌记在 :attr:`added_series` 中，召回的车系依赖它们。
+    """
+
+    def __init__(self, conn: sqlite3.Connection, extra: dict | None = None):
+        self.conn = conn
+        self.added_series: set[str] = set()
+        conn.executescript(ALIAS_SCHEMA)
+        extra = extra or {}
+        brands = {**BRAND_ALIASES}
+        for canonical, aliases in extra.get("brands", {}).items():
+            brands[canonical] = [*brands.get(canonical, []), *aliases]
+        series = extra.get("series", {})
+        explicit = {"brands": brands, "series": series}
+        self.version = hashlib.sha1(
+            json.dumps(explicit, ensure_ascii=False, sort_keys=True).encode()
+        ).hexdigest()
+
+        with conn:
+            conn.execute("DELETE FROM brand_aliases WHERE explicit = 1")
+            conn.execute("DELETE FROM series_aliases WHERE explicit = 1")
+            conn.executemany(
+                "INSERT OR REPLACE INTO brand_aliases VALUES (?, ?, 1)",
+                [
+                    (brand_key(alias), canonical)
+                    for canonical, aliases in brands.items()
+                    for alias in [canonical, *aliases]
+                ],
+            )
+            conn.executemany(
+                "INSERT OR REPLACE INTO series_aliases VALUES (?, ?, ?, 1)",
+                [
+                    (brand, self.series_key(brand, alias), canonical)
+                    for brand, names in series.items()
+                    for canonical, aliases in names.items()
+                    for alias in [canonical, *aliases]
+                ],
+            )
+        self.brands = dict(conn.execute("SELECT alias, canonical FROM brand_aliases"))
+        self.series = {
+            (brand, alias): canonical
+            for brand, alias, canonical in conn.execute(
+                "SELECT brand, alias, canonical FROM series_aliases"
+            )
+        }
+
+    @staticmethod
+    def series_key(brand: str, name: str) -> str:
+        key = normalize(pd.Series([name]))[0]
+        prefix = brand_key(brand)
+        if prefix and key.startswith(prefix) and len(key) > len(prefix):
+            key = key[len(prefix) :]
+        return key
+
+    def canonical_brands(self, names: pd.Series) -> pd.Series:
+        """逐行映射为统一品牌名（只对不同的名称做一次查找）。"""
+        codes, uniques = pd.factorize(names.fillna("").astype(str))
+        keys = normalize(pd.Series(uniques)).str.replace(_BRAND_SUFFIX, "", regex=True)
+        canonical, new = [], []
+        for name, key in zip(uniques, keys):
+            if key not in self.brands:
+                display = _BRAND_SUFFIX.sub("", name.strip()) or name.strip() or UNKNOWN
+                self.brands[key] = display
+                new.append((key, display))
+            canonical.append(self.brands[key])
+        if new:
+            with self.conn:
+                self.conn.executemany("INSERT OR IGNORE INTO brand_aliases VALUES (?, ?, 0)", new)
+        return pd.Series(np.asarray(canonical, dtype=object)[codes], index=names.index)
+
+    def canonical_series(self, brands: pd.Series, names: pd.Series) -> pd.Series:
+        """逐行映射为统一车系名；``brands`` 须已是统一品牌名。"""
+        pairs = pd.MultiIndex.from_arrays([brands, names.fillna("").astype(str)])
+        codes, uniques = pairs.factorize()
+        canonical, new = [], []
+        for brand, name in uniques:
+            key = self.series_key(brand, name)
+            if not key:
+                canonical.append("")
+                continue
+            if (brand, key) not in self.series:
+                self.series[brand, key] = name.strip()
+                new.append((brand, key, name.strip()))
+            canonical.append(self.series[brand, key])
+        if new:
+            self.added_series.update(brand for brand, _, _ in new)
+            with self.conn:
+                self.conn.executemany(
+                    "INSERT OR IGNORE INTO series_aliases VALUES (?, ?, ?, 0)", new
+                )
+        return pd.Series(np.asarray(canonical, dtype=object)[codes], index=brands.index)
+
+    def series_in_titles(self, brands: pd.Series, titles: pd.Series) -> pd.Series:
+        """从召回标题中找出该行品牌下的已知车系（最长的匹配），找不到为空。
+
+        只在同一品牌的车系中查找，单字车系（如“汉”“唐”）也能匹配。
+        """
+        keys: dict[str, list[str]] = {}
+        for brand, key in self.series:
+            if key:
+                keys.setdefault(brand, []).append(key)
+        found = pd.Series("", index=titles.index, dtype=object)
+        normalized = normalize(titles)
+        for brand in brands.unique():
+            if brand not in keys:
+                continue
+            mask = (brands == brand).to_numpy()
+            alternatives = sorted(keys[brand], key=len, reverse=True)
+            pattern = "|".join(re.escape(key) for key in alternatives)
+            matches = normalized[mask].str.findall(pattern)
+            found[mask] = [
+                self.series[brand, max(match, key=len)] if match else "" for match in matches
+            ]
+        return found
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS files (
+    path TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    mtime_ns INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS rows (
+    path TEXT NOT NULL,
+    source TEXT NOT NULL,
+    key TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    series TEXT NOT NULL,
+    title TEXT NOT NULL,
+    month TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS rows_path ON rows (path);
+CREATE INDEX IF NOT EXISTS rows_month ON rows (source, month);
+CREATE TABLE IF NOT EXISTS aggregates (
+    source TEXT NOT NULL,
+    brand TEXT NOT NULL,
+    series TEXT NOT NULL,
+    month TEXT NOT NULL,
+    value REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS aggregates_month ON aggregates (source, month);
+CREATE TABLE IF NOT EXISTS meta (
+    name TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def discover(out_dir: Path = OUT_DIR) -> dict[Path, str]:
+    """找出抓取输出中的数据文件：数据文件 -> 数据源。
+
+    文件和目录（Parquet、分区输出）都按名称前缀识别：``投诉_小鹏汽车_20250129.csv``
+    这样以 ``前缀_`` 开头的，以及全品牌增量抓取写出的 ``投诉.csv``、``投诉/``
+    这样去掉后缀后就是前缀的。目录中的每个数据文件是一个缓存单位。
+    """
+    found = {}
+    for entry in sorted(out_dir.glob("*")):
+        stem = entry.name.split(".", 1)[0]
+        source = next(
+            (
+                s.name
+                for s in SOURCES.values()
+                if stem == s.prefix or entry.name.startswith(s.prefix + "_")
+            ),
+            None,
+        )
+        if source is None:
+            continue
+        files = [entry] if entry.is_file() else sorted(entry.rglob("*"))
+        for file in files:
+            if file.is_file() and file.suffix in DATA_SUFFIXES:
+                found[file] = source
+    return found
+
+
+def read_file(path: Path, source: Source) -> pd.DataFrame:
+    """读出分析用到的列（文本），缺少的列为空。"""
+    columns = [source.brand, source.date, *source.series, *source.key, source.value, source.title]
+    columns = list(dict.fromkeys(c for c in columns if c))
+    if path.suffix == ".csv":
+        frame = pd.read_csv(
+            path,
+            dtype=str,
+            encoding="utf-8-sig",
+            keep_default_na=False,
+            usecols=lambda c: c in columns,
+        )
+    elif path.suffix == ".jsonl":
+        frame = pd.read_json(path, lines=True, dtype=False)
+    else:
+        frame = pd.read_parquet(path)
+    frame = frame.reindex(columns=columns)
+    if source.value:
+        frame[source.value] = to_number(frame[source.value])
+    text = [c for c in columns if c != source.value]
+    frame[text] = frame[text].fillna("").astype(str)
+    return frame
+
+
+def extract_rows(frame: pd.DataFrame, source: Source, path: Path) -> pd.DataFrame:
+    """把一个文件的数据整理为缓存行：去重键、原始品牌 / 车系、月份、数值。"""
+    rows = pd.DataFrame(index=frame.index)
+    rows["path"] = str(path)
+    rows["source"] = source.name
+    key = frame[source.key[0]]
+    for fallback in source.key[1:]:
+        key = key.where(key != "", frame[fallback])
+    rows["key"] = key
+    rows["brand"] = frame[source.brand]
+    series = pd.Series("", index=frame.index, dtype=object)
+    for column in reversed(source.series):
+        series = frame[column].where(frame[column] != "", series)
+    rows["series"] = series
+    rows["title"] = frame[source.title] if source.title else ""
+    rows["month"] = to_month(frame[source.date])
+    rows["value"] = frame[source.value] if source.value else 1.0
+    if source.name == "sales":
+        # 同一车型同月的销量以最后一次抓取为准
+        rows["key"] = rows["brand"] + "|" + rows["key"] + "|" + rows["month"]
+    return rows[rows["month"] != ""]
+
+
+@dataclass
+class RefreshStats:
+    read: int = 0
+    unchanged: int = 0
+    removed: int = 0
+    partitions: set[tuple[str, str]] = field(default_factory=set)
+    rebuilt: bool = False
+
+
+class Analytics:
+    """带增量缓存的跨数据源分析。"""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH, aliases: dict | None = None):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+        self.aliases = AliasIndex(self.conn, aliases)
+
+    def __enter__(self) -> Analytics:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def _months(self, path: str) -> set[tuple[str, str]]:
+        return set(
+            self.conn.execute("SELECT DISTINCT source, month FROM rows WHERE path = ?", (path,))
+        )
+
+    def refresh(self, out_dir: Path = OUT_DIR, rebuild: bool = False) -> RefreshStats:
+        """读入新增和变化的文件，重算受影响的（数据源, 月份）分区聚合。"""
+        stats = RefreshStats()
+        version = self.conn.execute("SELECT value FROM meta WHERE name = 'aliases'").fetchone()
+        if rebuild or version is None or version[0] != self.aliases.version:
+            stats.rebuilt = True
+        known = {
+            path: (size, mtime_ns)
+            for path, size, mtime_ns in self.conn.execute(
+                "SELECT path, size, mtime_ns FROM files"
+            )
+        }
+        current = discover(out_dir)
+        for path in set(known) - {str(p) for p in current}:
+            stats.partitions |= self._months(path)
+            stats.removed += 1
+            with self.conn:
+                self.conn.execute("DELETE FROM rows WHERE path = ?", (path,))
+                self.conn.execute("DELETE FROM files WHERE path = ?", (path,))
+
+        for file, name in current.items():
+            stat = file.stat()
+            if not rebuild and known.get(str(file)) == (stat.st_size, stat.st_mtime_ns):
+                stats.unchanged += 1
+                continue
+            rows = extract_rows(read_file(file, SOURCES[name]), SOURCES[name], file)
+            stats.partitions |= self._months(str(file))
+            stats.partitions |= set(zip(rows["source"], rows["month"]))
+            stats.read += 1
+            with self.conn:
+                self.conn.execute("DELETE FROM rows WHERE path = ?", (str(file),))
+                rows.to_sql("rows", self.conn, if_exists="append", index=False)
+                self.conn.execute(
+                    "INSERT OR REPLACE INTO files VALUES (?, ?, ?, ?)",
+                    (str(file), name, stat.st_size, stat.st_mtime_ns),
+                )
+
+        if stats.rebuilt:
+            stats.partitions = set(self.conn.execute("SELECT DISTINCT source, month FROM rows"))
+            with self.conn:
+                self.conn.execute("DELETE FROM aggregates")
+        stats.partitions = self._aggregate(stats.partitions)
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('aliases', ?)", (self.aliases.version,)
+            )
+        return stats
+
+    def _aggregate(self, partitions: Iterable[tuple[str, str]]) -> set[tuple[str, str]]:
+        """重算给定分区，返回实际重算的分区（含因新车系而重算的召回月份）。"""
+        by_source: dict[str, set[str]] = {}
+        for source, month in partitions:
+            by_source.setdefault(source, set()).add(month)
+        self.aliases.added_series.clear()
+        # 召回的车系从标题中匹配，先处理销量和投诉，让别名索引先收录车系
+        for source in SOURCES:
+            if source == "recalls" and self.aliases.added_series:
+                # 新收录的车系可能出现在以前聚合过的召回标题里，这些品牌的召回月份都要重算
+                by_source.setdefault(source, set()).update(
+                    self._recall_months(self.aliases.added_series)
+                )
+            months = sorted(by_source.get(source, ()))
+            for i in range(0, len(months), 500):
+                self._aggregate_months(source, months[i : i + 500])
+        return {(source, month) for source, months in by_source.items() for month in months}
+
+    def _recall_months(self, brands: set[str]) -> set[str]:
+        """这些（统一后的）品牌有召回的月份。"""
+        rows = pd.read_sql_query(
+            "SELECT DISTINCT brand, month FROM rows WHERE source = 'recalls'", self.conn
+        )
+        if rows.empty:
+            return set()
+        rows["brand"] = self.aliases.canonical_brands(rows["brand"])
+        return set(rows.loc[rows["brand"].isin(brands), "month"])
+
+    def _aggregate_months(self, source: str, months: list[str]) -> None:
+        placeholders = ",".join("?" * len(months))
+        rows = pd.read_sql_query(
+            "SELECT key, brand, series, title, month, value FROM rows "
+            f"WHERE source = ? AND month IN ({placeholders}) ORDER BY rowid",
+            self.conn,
+            params=[source, *months],
+        )
+        # 后写入的行（更新的抓取）优先
+        rows = rows.drop_duplicates("key", keep="last")
+        rows["brand"] = self.aliases.canonical_brands(rows["brand"])
+        if source == "recalls":
+            rows["series"] = self.aliases.series_in_titles(rows["brand"], rows["title"])
+        else:
+            rows["series"] = self.aliases.canonical_series(rows["brand"], rows["series"])
+        aggregated = (
+            rows.groupby(["brand", "series", "month"], sort=False)["value"].sum().reset_index()
+        )
+        aggregated.insert(0, "source", source)
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM aggregates WHERE source = ? AND month IN ({placeholders})",
+                [source, *months],
+            )
+            aggregated.to_sql("aggregates", self.conn, if_exists="append", index=False)
+
+    def monthly(self, level: str = "series") -> pd.DataFrame:
+        """按品牌（和车系）、月份关联销量、投诉和召回，计算每万辆投诉和环比。"""
+        aggregates = pd.read_sql_query(
+            "SELECT source, brand, series, month, value FROM aggregates", self.conn
+        )
+        if aggregates.empty:
+            return pd.DataFrame(columns=[*COLUMN_NAMES, "month_index"])
+        keys = ["brand", "month"] if level == "brand" else ["brand", "series", "month"]
+        table = (
+            aggregates.pivot_table(
+                index=keys, columns="source", values="value", aggfunc="sum", fill_value=0
+            )
+            .reindex(columns=list(SOURCES), fill_value=0)
+            .reset_index()
+        )
+        table.columns.name = None
+        table[list(SOURCES)] = table[list(SOURCES)].astype("int64")
+        entity = keys[:-1]
+        table = table.sort_values(keys, ignore_index=True)
+
+        sold = table["sales"].to_numpy(dtype=float)
+        complaints = table["complaints"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["complaints_per_10k"] = np.where(sold > 0, complaints / sold * 1e4, np.nan)
+
+        # 环比只在上一行正好是同一实体的上一个月时计算
+        year_month = table["month"].str.split("-", expand=True).astype(int)
+        index = (year_month[0] * 12 + year_month[1]).to_numpy()
+        same = np.ones(len(table), dtype=bool)
+        for column in entity:
+            values = table[column].to_numpy()
+            same[1:] &= values[1:] == values[:-1]
+        same[0] = False
+        previous = np.zeros(len(table), dtype=bool)
+        previous[1:] = same[1:] & (index[1:] - index[:-1] == 1)
+        before = np.roll(complaints, 1)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            table["complaints_mom"] = np.where(
+                previous & (before > 0), complaints / before - 1, np.nan
+            )
+            # 销量为 0 表示该月没有销量数据，不计算环比
+            before = np.roll(sold, 1)
+            table["sales_mom"] = np.where(
+                previous & (before > 0) & (sold > 0), sold / before - 1, np.nan
+            )
+        table["month_index"] = index
+        return table
+
+    def trends(self, monthly: pd.DataFrame, level: str = "series") -> pd.DataFrame:
+        """每个品牌（车系）的合计和按月线性趋势（最小二乘斜率，单位：每月）。"""
+        entity = ["brand"] if level == "brand" else ["brand", "series"]
+        frame = monthly.copy()
+        x = frame["month_index"].astype(float)
+        frame["x"], frame["x2"] = x, x * x
+        frame["xy_complaints"] = x * frame["complaints"]
+        rate = frame["complaints_per_10k"]
+        has_rate = rate.notna()
+        frame["n_rate"] = has_rate.astype(float)
+        frame["x_rate"] = x.where(has_rate, 0)
+        frame["x2_rate"] = (x * x).where(has_rate, 0)
+        frame["y_rate"] = rate.fillna(0)
+        frame["xy_rate"] = (x * rate).fillna(0)
+        sums = frame.groupby(entity).agg(
+            months=("month", "size"),
+            first_month=("month", "min"),
+            last_month=("month", "max"),
+            sales=("sales", "sum"),
+            complaints=("complaints", "sum"),
+            recalls=("recalls", "sum"),
+            sx=("x", "sum"),
+            sx2=("x2", "sum"),
+            sxy=("xy_complaints", "sum"),
+            n_rate=("n_rate", "sum"),
+            sx_rate=("x_rate", "sum"),
+            sx2_rate=("x2_rate", "sum"),
+            sy_rate=("y_rate", "sum"),
+            sxy_rate=("xy_rate", "sum"),
+        )
+
+        def slope(n, sx, sx2, sy, sxy):
+            denominator = n * sx2 - sx * sx
+            with np.errstate(divide="ignore", invalid="ignore"):
+                return np.where(denominator > 0, (n * sxy - sx * sy) / denominator, np.nan)
+
+        result = sums[["months", "first_month", "last_month", "sales", "complaints", "recalls"]]
+        result = result.copy()
+        sold = result["sales"].to_numpy(dtype=float)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            result["complaints_per_10k"] = np.where(
+                sold > 0, result["complaints"].to_numpy(dtype=float) / sold * 1e4, np.nan
+            )
+        result["complaints_slope"] = slope(
+            sums["months"], sums["sx"], sums["sx2"], sums["complaints"], sums["sxy"]
+        )
+        result["complaints_per_10k_slope"] = slope(
+            sums["n_rate"], sums["sx_rate"], sums["sx2_rate"], sums["sy_rate"], sums["sxy_rate"]
+        )
+        return result.reset_index().sort_values("complaints", ascending=False, ignore_index=True)
+
+
+# 输出列名
+COLUMN_NAMES = {
+    "brand": "品牌",
+    "series": "车系",
+    "month": "月份",
+    "sales": "销量",
+    "complaints": "投诉数",
+    "recalls": "召回数",
+    "complaints_per_10k": "每万辆投诉",
+    "complaints_mom": "投诉环比",
+    "sales_mom": "销量环比",
+    "months": "月数",
+    "first_month": "起始月份",
+    "last_month": "结束月份",
+    "complaints_slope": "投诉数月均变化",
+    "complaints_per_10k_slope": "每万辆投诉月均变化",
+}
+
+
+def rename(frame: pd.DataFrame) -> pd.DataFrame:
+    return frame[[c for c in frame.columns if c in COLUMN_NAMES]].rename(columns=COLUMN_NAMES)
+
+
+def save(frame: pd.DataFrame, path: Path, fmt: str = "csv") -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if fmt == "csv":
+        frame.to_csv(path, index=False, encoding="utf-8-sig")
+    elif fmt == "jsonl":
+        frame.to_json(path, orient="records", lines=True, force_ascii=False)
+    else:
+        frame.to_parquet(path, index=False)
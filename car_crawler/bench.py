@@ -0,0 +1,354 @@
+"""离线基准测试：在本地回放服务器上测量各数据源 × 解析后端的抓取性能。
+
+列表页来自录制目录（``--record`` 抓取得到，见 :mod:`car_crawler.replay`）；
+没有录制时用 golden 样本合成，每个数据源重复 ``pages`` 页。每个组合在
+新启动的进程中运行（只做抓取和解析，不写文件），峰值内存互不影响；
+回放服务器在主进程中运行，可注入延迟和错误。
+
+抓取和解析走各数据源自己的 ``crawl_pages``：录制的列表页按 ``crawl_pages``
+的参数（车质网的品牌/车系/车型、召回的查询条件）分组，每组从起始页起连续
+录到的页交给一次调用。报告页/秒、行/秒、请求延迟 p50/p99（单独一遍只抓取
+不解析，按每个请求的实际耗时精确计算，不含重试退避）、每页解析耗时、峰值内存
+和失败页数，连同 lxml、beautifulsoup4、aiohttp 等依赖的版本写入 JSON，
+升级依赖前后各跑一次并用 ``--compare`` 对比。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import math
+import re
+import sys
+import tempfile
+import time
+import unicodedata
+from collections.abc import AsyncIterator, Iterable
+from concurrent.futures import ProcessPoolExecutor
+from importlib import metadata
+from multiprocessing import get_context
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+from . import golden, recall, sales, zlts
+from .fetcher import AsyncFetcher
+from .metrics import REGISTRY
+from .parsing import PARSERS, Record
+from .replay import Cassette, Faults, ReplayServer
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# 数据源 -> 列表页路径前缀，用于从录制中挑出列表页
+LIST_PREFIXES = {
+    "zlts": zlts.LIST_PATH.split("{", 1)[0],
+    "sales": sales.LIST_PATH.split("{", 1)[0],
+    "recall": recall.LIST_PATH,
+}
+SOURCES = tuple(LIST_PREFIXES)
+DEFAULT_PAGES = 50
+PACKAGES = ("lxml", "beautifulsoup4", "aiohttp", "requests")
+
+
+def list_pages(cassette: Cassette) -> dict[str, list[str]]:
+    """数据源 -> 录制的列表页路径（含查询串）。"""
+    found: dict[str, list[str]] = {source: [] for source in SOURCES}
+    for key, entry in cassette.entries().items():
+        if entry.status != 200:
+            continue
+        for source, prefix in LIST_PREFIXES.items():
+            if key.startswith(prefix):
+                found[source].append(key)
+    return {source: sorted(keys) for source, keys in found.items()}
+
+
+def golden_cassette(path: Path, pages: int = DEFAULT_PAGES) -> Cassette:
+    """用 golden 样本合成录制：每个数据源 ``pages`` 页，URL 不同，内容轮流取自该源的样本。"""
+    cassette = Cassette(path)
+    urls = {
+        "zlts": lambda page: zlts.list_url(0, 0, 0, page),
+        "sales": sales.list_url,
+        "recall": recall.list_url,
+    }
+    contents: dict[str, list[bytes]] = {}
+    for fixture in golden.fixtures():
+        contents.setdefault(fixture.stem.split("_", 1)[0], []).append(fixture.read_bytes())
+    for source, samples in contents.items():
+        # 同一数据源有多个样本时轮流使用
+        for page in range(1, pages + 1):
+            cassette.record(urls[source](page), 200, "utf-8", samples[(page - 1) % len(samples)])
+    return cassette
+
+
+def peak_rss_mb() -> float | None:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux 单位为 KB，macOS 为字节
+    return peak / 1024 / 1024 if sys.platform == "darwin" else peak / 1024
+
+
+def _path_pattern(template: str) -> re.Pattern:
+    """把 ``/zlts/{brand}-...-{page}.shtml`` 这样的路径模板转成带命名分组的正则。"""
+    return re.compile(re.sub(r"\\\{(\w+)\\\}", r"(?P<\1>\\d+)", re.escape(template)) + "$")
+
+
+_ZLTS_PAGE = _path_pattern(zlts.LIST_PATH)
+_SALES_PAGE = _path_pattern(sales.LIST_PATH)
+
+
+def _page_of(source: str, key: str) -> tuple[tuple, int] | None:
+    """录制的列表页路径 -> ``(crawl_pages 参数, 页码)``；认不出的路径返回 ``None``。"""
+    if source == "zlts":
+        match = _ZLTS_PAGE.match(key)
+        if match is None:
+            return None
+        scope = tuple((name, int(match[name])) for name in ("brand", "series", "model"))
+        return scope, int(match["page"])
+    if source == "sales":
+        match = _SALES_PAGE.match(key)
+        return ((), int(match["page"])) if match else None
+    query = {k: v[0] for k, v in parse_qs(urlsplit(key).query, keep_blank_values=True).items()}
+    try:
+        page, page_size = int(query["pageNum"]), int(query["pageSize"])
+    except (KeyError, ValueError):
+        return None
+    scope = (
+        ("keyword", query.get("keyword", "")),
+        ("page_size", page_size),
+        ("start_date", query.get("startDate", "")),
+        ("end_date", query.get("endDate", "")),
+    )
+    return scope, page
+
+
+def crawl_jobs(source: str, keys: Iterable[str]) -> list[tuple[dict, list[str]]]:
+    """把录制的列表页按 ``crawl_pages`` 的参数分组，返回 ``[(参数, 会请求的路径)]``。
+
+    每组只取从起始页起连续录到的页（车质网从录到的最小页码开始，其余从第 1 页），
+    保证 ``crawl_pages`` 请求的每一页都在录制中。
+    """
+    groups: dict[tuple, dict[int, str]] = {}
+    for key in keys:
+        found = _page_of(source, key)
+        if found is not None:
+            scope, page = found
+            groups.setdefault(scope, {})[page] = key
+    jobs = []
+    for scope, by_page in sorted(groups.items()):
+        first = min(by_page) if source == "zlts" else 1
+        last = first - 1
+        while last + 1 in by_page:
+            last += 1
+        if last < first:
+            continue
+        kwargs = {**dict(scope), "pages": last}
+        if source == "zlts":
+            kwargs["first_page"] = first
+        jobs.append((kwargs, [by_page[page] for page in range(first, last + 1)]))
+    return jobs
+
+
+def _crawl_pages(
+    source: str, fetcher: AsyncFetcher, base_url: str, parser: str, kwargs: dict
+) -> AsyncIterator[tuple[int, list[Record] | None]]:
+    crawl = {"zlts": zlts.crawl_pages, "sales": sales.crawl_pages, "recall": recall.crawl_pages}
+    return crawl[source](fetcher, base_url=base_url, parser=parser, **kwargs)
+
+
+def percentile(values: list[float], q: float) -> float:
+    """精确分位数：排序后在相邻两个值之间线性插值。"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    rank = q * (len(ordered) - 1)
+    lower = math.floor(rank)
+    upper = min(lower + 1, len(ordered) - 1)
+    return ordered[lower] + (ordered[upper] - ordered[lower]) * (rank - lower)
+
+
+async def _fetch_latencies(urls: list[str], concurrency: int, retries: int) -> list[float]:
+    """只抓取不解析，返回每个成功请求最后一次尝试的耗时（秒），不含重试前的退避等待。"""
+    async with AsyncFetcher(
+        concurrency=concurrency, rate=0, retries=retries, backoff=0.05
+    ) as fetcher:
+        return [result.request_seconds async for result in fetcher.fetch_many(urls) if result.ok]
+
+
+async def _crawl(
+    source: str,
+    parser: str,
+    base_url: str,
+    jobs: list[dict],
+    concurrency: int,
+    retries: int,
+) -> tuple[int, int, int]:
+    """用数据源的 ``crawl_pages`` 依次抓取并解析每组页，返回 ``(成功页数, 行数, 失败页数)``。"""
+    pages = rows = failed = 0
+    async with AsyncFetcher(
+        concurrency=concurrency, rate=0, retries=retries, backoff=0.05
+    ) as fetcher:
+        for kwargs in jobs:
+            async for _, parsed in _crawl_pages(source, fetcher, base_url, parser, kwargs):
+                if parsed is None:
+                    failed += 1
+                    continue
+                pages += 1
+                rows += len(parsed)
+    return pages, rows, failed
+
+
+def run_case(
+    source: str,
+    parser: str,
+    base_url: str,
+    jobs: list[tuple[dict, list[str]]],
+    concurrency: int = 8,
+    retries: int = 3,
+) -> dict:
+    """在独立进程中运行一个组合，返回测量结果。
+
+    解析在事件循环里同步进行，会推迟响应的处理、虚增请求耗时，所以先跑一遍
+    只抓取不解析的、记录每个请求的耗时算延迟分位数，再跑一遍 ``crawl_pages``
+    抓取加解析的测吞吐量和解析耗时。
+    """
+    urls = [base_url + key for _, keys in jobs for key in keys]
+    latencies = asyncio.run(_fetch_latencies(urls, concurrency, retries))
+    REGISTRY.reset()
+    start = time.perf_counter()
+    pages, rows, failed = asyncio.run(
+        _crawl(source, parser, base_url, [kwargs for kwargs, _ in jobs], concurrency, retries)
+    )
+    elapsed = time.perf_counter() - start
+    parse = REGISTRY.histogram("parse_seconds")
+    return {
+        "source": source,
+        "parser": parser,
+        "pages": pages,
+        "rows": rows,
+        "failed": failed,
+        "retries": REGISTRY.total("http_retries_total"),
+        "seconds": round(elapsed, 3),
+        "pages_per_sec": round(pages / elapsed, 2) if elapsed else 0.0,
+        "rows_per_sec": round(rows / elapsed, 1) if elapsed else 0.0,
+        "latency_p50_ms": round(percentile(latencies, 0.5) * 1000, 2),
+        "latency_p99_ms": round(percentile(latencies, 0.99) * 1000, 2),
+        "parse_ms_per_page": round(parse.sum / parse.count * 1000, 3) if parse.count else 0.0,
+        "peak_rss_mb": round(peak, 1) if (peak := peak_rss_mb()) is not None else None,
+    }
+
+
+def versions() -> dict[str, str | None]:
+    found = {"python": sys.version.split()[0]}
+    for package in PACKAGES:
+        try:
+            found[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            found[package] = None
+    return found
+
+
+def run(
+    cassette: Cassette,
+    sources: Iterable[str] = SOURCES,
+    parsers: Iterable[str] = PARSERS,
+    faults: Faults | None = None,
+    concurrency: int = 8,
+    retries: int = 3,
+) -> list[dict]:
+    pages = list_pages(cassette)
+    results = []
+    # spawn 保证每个组合都从干净的进程开始，峰值内存互不影响
+    context = get_context("spawn")
+    print_header()
+    with ReplayServer(cassette, faults) as server:
+        for source in sources:
+            jobs = crawl_jobs(source, pages[source])
+            if not jobs:
+                print(f"  {source}: 录制中没有列表页，跳过")
+                continue
+            for parser in parsers:
+                with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+                    result = pool.submit(
+                        run_case, source, parser, server.url, jobs, concurrency, retries
+                    ).result()
+                results.append(result)
+                print_result(result)
+    return results
+
+
+COLUMNS = (
+    ("数据源", "source", "<8", ""),
+    ("解析后端", "parser", "<10", ""),
+    ("页数", "pages", ">6", ""),
+    ("行数", "rows", ">7", ""),
+    ("页/秒", "pages_per_sec", ">9", ".1f"),
+    ("行/秒", "rows_per_sec", ">10", ".0f"),
+    ("p50 ms", "latency_p50_ms", ">8", ".1f"),
+    ("p99 ms", "latency_p99_ms", ">8", ".1f"),
+    ("解析 ms/页", "parse_ms_per_page", ">11", ".3f"),
+    ("峰值内存 MB", "peak_rss_mb", ">12", ".1f"),
+    ("失败", "failed", ">5", ""),
+)
+
+
+def _pad(text: str, spec: str) -> str:
+    """按显示宽度对齐（中文字符占两列）。"""
+    width = int(spec[1:]) - sum(unicodedata.east_asian_width(c) in "WF" for c in text)
+    return f"{text:{spec[0]}{max(width, 0)}}"
+
+
+def print_header() -> None:
+    print("".join(_pad(title, align) for title, _, align, _ in COLUMNS))
+
+
+def print_result(result: dict, baseline: dict | None = None) -> None:
+    cells = []
+    for _, key, align, fmt in COLUMNS:
+        value = result[key]
+        cells.append(_pad("-" if value is None else format(value, fmt), align))
+    line = "".join(cells)
+    if baseline is not None and baseline["pages_per_sec"]:
+        change = result["pages_per_sec"] / baseline["pages_per_sec"] - 1
+        parse_change = (
+            result["parse_ms_per_page"] / baseline["parse_ms_per_page"] - 1
+            if baseline["parse_ms_per_page"]
+            else 0.0
+        )
+        line += f"  页/秒 {change:+.1%}，解析耗时 {parse_change:+.1%}"
+    print(line)
+
+
+def compare(results: list[dict], path: Path) -> None:
+    """与之前保存的基准结果逐项对比。"""
+    previous = json.loads(path.read_text(encoding="utf-8"))
+    baseline = {(r["source"], r["parser"]): r for r in previous["results"]}
+    current = versions()
+    changed = [
+        f"{name} {previous['versions'].get(name)} -> {version}"
+        for name, version in current.items()
+        if previous["versions"].get(name) != version
+    ]
+    print(f"\n与 {path} 对比（{'，'.join(changed) or '依赖版本相同'}）")
+    print_header()
+    for result in results:
+        print_result(result, baseline.get((result["source"], result["parser"])))
+
+
+def save(results: list[dict], path: Path, settings: dict) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    data = {
+        "time": time.strftime("%Y-%m-%d %H:%M:%S"),
+        "versions": versions(),
+        "settings": settings,
+        "results": results,
+    }
+    path.write_text(json.dumps(data, ensure_ascii=False, indent=2) + "\n", encoding="utf-8")
+
+
+def run_golden(pages: int = DEFAULT_PAGES, **kwargs) -> list[dict]:
+    """用 golden 样本合成的录制运行基准测试。"""
+    with tempfile.TemporaryDirectory() as tmp:
+        return run(golden_cassette(Path(tmp), pages), **kwargs)
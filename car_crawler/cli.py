@@ -0,0 +1,673 @@
+"""命令行入口（``uv run main.py <命令> ...``）。"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import cProfile
+import inspect
+import json
+import os
+import pstats
+import time
+from collections.abc import AsyncIterator, Callable
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import AsyncExitStack
+from multiprocessing import get_context
+from pathlib import Path
+from types import ModuleType
+
+from . import bench, golden, recall, sales, sweep, zlts
+from .details import DEFAULT_BATCH_SIZE as DETAILS_BATCH_SIZE
+from .details import DEFAULT_PATH as DETAILS_PATH
+from .details import DetailEnricher, DetailStore
+from .fetcher import AsyncFetcher
+from .http_cache import DEFAULT_MAX_BYTES as CACHE_MAX_BYTES
+from .http_cache import DEFAULT_PATH as CACHE_PATH
+from .http_cache import ResponseCache
+from .metrics import REGISTRY, serve
+from .output import OUT_DIR, output_path
+from .parsing import DEFAULT_PARSER, PARSERS, Record
+from .replay import DEFAULT_PORT as REPLAY_PORT
+from .replay import Cassette, Faults, ReplayServer
+from .seen_index import DEFAULT_PATH as SEEN_INDEX_PATH
+from .seen_index import SeenIndex, scope_key
+from .writers import (
+    DEFAULT_CHUNK_ROWS,
+    FORMATS,
+    PARTITIONS,
+    compact_parquet,
+    open_writer,
+    remove_output,
+)
+
+
+def add_fetch_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("抓取参数")
+    group.add_argument("--concurrency", type=int, default=8, help="最大并发请求数（默认：8）")
+    group.add_argument("--rate", type=float, default=2.0, help="每个主机每秒最多请求数，0=不限（默认：2）")
+    group.add_argument("--retries", type=int, default=3, help="失败重试次数（默认：3）")
+    group.add_argument("--base-url", default=None, help=argparse.SUPPRESS)
+    group.add_argument(
+        "--parser", choices=PARSERS, default=DEFAULT_PARSER, help=f"解析后端（默认：{DEFAULT_PARSER}）"
+    )
+    group.add_argument("--cache", default=str(CACHE_PATH), help=f"响应缓存文件（默认：{CACHE_PATH}）")
+    group.add_argument(
+        "--cache-size",
+        type=int,
+        default=CACHE_MAX_BYTES // (1024 * 1024),
+        help=f"响应缓存上限，单位 MB（默认：{CACHE_MAX_BYTES // (1024 * 1024)}）",
+    )
+    group.add_argument("--no-cache", action="store_true", help="不使用响应缓存")
+    group.add_argument(
+        "--record", default=None, metavar="DIR", help="把成功的响应录制到目录，用于离线回放和基准测试"
+    )
+
+
+def add_fault_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("回放服务器参数")
+    group.add_argument("--latency", type=float, default=20.0, help="每个响应的固定延迟，毫秒（默认：20）")
+    group.add_argument("--jitter", type=float, default=10.0, help="额外随机延迟上限，毫秒（默认：10）")
+    group.add_argument("--error-rate", type=float, default=0.0, help="返回错误的比例，0~1（默认：0）")
+    group.add_argument("--error-status", type=int, default=503, help="注入错误的状态码（默认：503）")
+    group.add_argument("--seed", type=int, default=0, help="随机种子，保证多次运行注入相同（默认：0）")
+
+
+def make_faults(args: argparse.Namespace) -> Faults:
+    return Faults(args.latency, args.jitter, args.error_rate, args.error_status, args.seed)
+
+
+def add_output_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("输出参数")
+    group.add_argument("--format", choices=FORMATS, default="csv", help="输出格式（默认：csv）")
+    group.add_argument(
+        "--partition",
+        choices=PARTITIONS,
+        nargs="+",
+        default=[],
+        help="按品牌和/或月份分区写出到目录",
+    )
+    group.add_argument(
+        "--chunk-rows",
+        type=int,
+        default=DEFAULT_CHUNK_ROWS,
+        help=f"每次写出的行数（默认：{DEFAULT_CHUNK_ROWS}）",
+    )
+
+
+def add_details_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("详情参数")
+    group.add_argument("--details", action="store_true", help="抓取详情页并补充详情字段")
+    group.add_argument(
+        "--details-batch",
+        type=int,
+        default=DETAILS_BATCH_SIZE,
+        help=f"每批抓取的详情页数（默认：{DETAILS_BATCH_SIZE}）",
+    )
+    group.add_argument("--parse-workers", type=int, default=None, help="详情解析进程数（默认：CPU 核数）")
+    group.add_argument(
+        "--details-store", default=str(DETAILS_PATH), help=f"详情缓存文件（默认：{DETAILS_PATH}）"
+    )
+
+
+def add_metrics_args(parser: argparse.ArgumentParser) -> None:
+    group = parser.add_argument_group("统计参数")
+    group.add_argument(
+        "--metrics-port",
+        type=int,
+        default=None,
+        metavar="PORT",
+        help="运行期间在 http://127.0.0.1:PORT/metrics 提供 Prometheus 格式的统计",
+    )
+    group.add_argument(
+        "--profile",
+        action="store_true",
+        help="用 cProfile 分析主进程，结果保存到 out/ 并打印耗时最多的函数",
+    )
+
+
+def make_enricher(
+    args: argparse.Namespace, fetcher: AsyncFetcher, source: str, stack: AsyncExitStack
+) -> DetailEnricher | None:
+    """``--details`` 时创建详情补充器，存储和进程池由 ``stack`` 负责关闭。
+
+    这里已在事件循环中，进程池用 spawn 启动，不 fork 正在运行的事件循环。
+    """
+    if not args.details:
+        return None
+    store = stack.enter_context(DetailStore(args.details_store))
+    pool = stack.enter_context(
+        ProcessPoolExecutor(args.parse_workers or os.cpu_count(), mp_context=get_context("spawn"))
+    )
+    return DetailEnricher(fetcher, store, source, batch_size=args.details_batch, executor=pool)
+
+
+def print_details(enricher: DetailEnricher | None) -> None:
+    if enricher is not None:
+        print(f"详情：新抓取 {enricher.fetched} 页，复用已缓存 {enricher.reused} 条")
+        if enricher.failed:
+            print(f"  {len(enricher.failed)} 个链接没有拿到详情，下次运行重新抓取")
+
+
+def make_fetcher(args: argparse.Namespace) -> AsyncFetcher:
+    cache = None
+    if not args.no_cache:
+        cache = ResponseCache(args.cache, max_bytes=args.cache_size * 1024 * 1024)
+    return AsyncFetcher(
+        concurrency=args.concurrency,
+        rate=args.rate,
+        retries=args.retries,
+        cache=cache,
+        recorder=Cassette(args.record) if args.record else None,
+    )
+
+
+async def in_page_order(
+    pages: AsyncIterator[tuple[int, list[Record] | None]], first_page: int = 1
+) -> AsyncIterator[tuple[int, list[Record]]]:
+    """把按到达顺序产出的页重新按页码排列；只缓存先到的页，抓取失败的页直接跳过。"""
+    pending: dict[int, list[Record] | None] = {}
+    next_page = first_page
+    async for page, rows in pages:
+        pending[page] = rows
+        while next_page in pending:
+            rows = pending.pop(next_page)
+            if rows is not None:
+                yield next_page, rows
+            next_page += 1
+    for page in sorted(pending):
+        if pending[page] is not None:
+            yield page, pending[page]
+
+
+async def save_pages(
+    args: argparse.Namespace,
+    pages: AsyncIterator[tuple[int, list[Record] | None]],
+    source: ModuleType,
+    prefix: str,
+    name_parts: Callable[[Record], list[str]] = lambda row: [],
+    enricher: DetailEnricher | None = None,
+) -> tuple[Path | None, int]:
+    """边抓边按页码顺序分块写出，返回 ``(输出位置, 行数)``。
+
+    输出文件名可能取决于数据（如品牌名），写入器在第一行到达时才创建。
+    有 ``enricher`` 时每页先补充详情字段再写出。
+    """
+    fields = source.FIELDS + (enricher.fields if enricher else [])
+    writer = None
+    try:
+        async for page, rows in in_page_order(pages):
+            print(f"  第 {page} 页: {len(rows)} 条")
+            if not rows:
+                continue
+            if writer is None:
+                writer = open_writer(
+                    output_path(prefix, *name_parts(rows[0])),
+                    args.format,
+                    fields,
+                    source.BRAND_FIELD,
+                    source.DATE_FIELD,
+                    args.partition,
+                    chunk_rows=args.chunk_rows,
+                )
+            if enricher is not None:
+                rows = await enricher.enrich(rows)
+            with REGISTRY.timer("write_seconds", format=args.format):
+                writer.write(rows)
+    finally:
+        if writer is not None:
+            # 最后一块和 Parquet footer 在关闭时才写出，同样计入写出耗时
+            with REGISTRY.timer("write_seconds", format=args.format):
+                writer.close()
+    return (writer.path, writer.rows) if writer is not None else (None, 0)
+
+
+def print_saved(path: Path | None, count: int) -> None:
+    if path is None:
+        print("没有抓取到数据")
+    else:
+        print(f"共 {count} 条，已保存到 {path}")
+
+
+def print_options(title: str, options: list[tuple[int, str]]) -> None:
+    print(f"{title}ID | {title}名称")
+    print("-" * 21)
+    for option_id, name in options:
+        print(f"{option_id:>6} | {name}")
+
+
+async def run_zlts(args: argparse.Namespace) -> None:
+    base_url = args.base_url or zlts.BASE_URL
+    async with make_fetcher(args) as fetcher, AsyncExitStack() as stack:
+        if args.brands:
+            print_options("品牌", await zlts.fetch_brands(fetcher, base_url))
+            return
+        if args.series is not None:
+            print_options("车系", await zlts.fetch_series(fetcher, args.series, base_url))
+            return
+        if args.models:
+            brand, series = args.models
+            print_options("车型", await zlts.fetch_models(fetcher, brand, series, base_url))
+            return
+
+        enricher = make_enricher(args, fetcher, "zlts", stack)
+        if args.incremental:
+            await run_zlts_incremental(args, fetcher, base_url, enricher)
+            print_details(enricher)
+            return
+
+        print(f"开始抓取投诉数据：{args.pages} 页，并发 {args.concurrency}")
+        path, count = await save_pages(
+            args,
+            zlts.crawl_pages(
+                fetcher,
+                args.brand,
+                args.series_id,
+                args.model_id,
+                args.pages,
+                base_url,
+                parser=args.parser,
+            ),
+            zlts,
+            "投诉",
+            lambda row: [
+                row["投诉品牌"] if args.brand else "",
+                row["投诉车系"] if args.series_id else "",
+            ],
+            enricher,
+        )
+    print_saved(path, count)
+    print_details(enricher)
+
+
+async def run_zlts_incremental(
+    args: argparse.Namespace,
+    fetcher: AsyncFetcher,
+    base_url: str,
+    enricher: DetailEnricher | None = None,
+) -> None:
+    scope = scope_key(args.brand, args.series_id, args.model_id)
+    fields = zlts.FIELDS + (enricher.fields if enricher else [])
+    stem = path = None
+    written = held_back = 0
+    with SeenIndex(args.index) as index:
+        print(f"增量抓取投诉数据：最多 {args.pages} 页，高水位 {index.high_water(scope)}")
+        if not index.complete(scope):
+            print("上次抓取未完成，本次跳过已见投诉继续翻页，补抓遗漏的投诉")
+        pages = zlts.crawl_new(
+            fetcher,
+            index,
+            args.brand,
+            args.series_id,
+            args.model_id,
+            args.pages,
+            base_url,
+            parser=args.parser,
+        )
+        async for page, rows in pages:
+            if stem is None:
+                brand_name = rows[0]["投诉品牌"] if args.brand else ""
+                series_name = rows[0]["投诉车系"] if args.series_id else ""
+                stem = output_path("投诉", brand_name, series_name, dated=False)
+            if enricher is not None:
+                rows = await enricher.enrich(rows)
+                # 详情没拿到的行既不写出也不记录，下次运行作为新投诉重新抓取
+                kept = [row for row in rows if row[enricher.link_field] not in enricher.failed]
+                held_back += len(rows) - len(kept)
+                rows = kept
+            # 先落盘再记录编号，避免中途失败导致数据丢失。每页单独打开写入器并关闭：
+            # Parquet 分片关闭时才写 footer，记录编号前必须是完整可读的文件
+            with REGISTRY.timer("write_seconds", format=args.format), open_writer(
+                stem,
+                args.format,
+                fields,
+                zlts.BRAND_FIELD,
+                zlts.DATE_FIELD,
+                args.partition,
+                append=True,
+                chunk_rows=args.chunk_rows,
+            ) as writer:
+                writer.write(rows)
+            path = writer.path
+            written += writer.rows
+            index.add(scope, [row["投诉编号"] for row in rows])
+            print(f"  第 {page} 页: 新增 {len(rows)} 条")
+        if held_back:
+            # 暂缓的投诉编号可能低于高水位，标记为未完成，下次运行只按已见编号跳过
+            index.mark_incomplete(scope)
+            print(f"{held_back} 条投诉没有拿到详情，暂不写出，下次运行重试")
+    if path is None:
+        print("没有新的投诉")
+        return
+    if args.format == "parquet":
+        # 每页一个分片，结束后合并，避免大量小文件
+        with REGISTRY.timer("write_seconds", format=args.format):
+            compact_parquet(path)
+    print(f"共新增 {written} 条，已追加到 {path}")
+
+
+async def run_sales(args: argparse.Namespace) -> None:
+    print(f"开始抓取销量排行：{args.pages} 页")
+    async with make_fetcher(args) as fetcher:
+        path, count = await save_pages(
+            args,
+            sales.crawl_pages(
+                fetcher, args.pages, args.base_url or sales.BASE_URL, parser=args.parser
+            ),
+            sales,
+            "销量排行",
+        )
+    print_saved(path, count)
+
+
+async def run_recall(args: argparse.Namespace) -> None:
+    print(f"开始抓取召回新闻：{args.pages} 页" + (f"，关键词 {args.keyword}" if args.keyword else ""))
+    async with make_fetcher(args) as fetcher, AsyncExitStack() as stack:
+        enricher = make_enricher(args, fetcher, "recall", stack)
+        path, count = await save_pages(
+            args,
+            recall.crawl_pages(
+                fetcher,
+                args.pages,
+                args.keyword,
+                args.page_size,
+                args.start_date,
+                args.end_date,
+                args.base_url or recall.BASE_URL,
+                parser=args.parser,
+            ),
+            recall,
+            "召回新闻",
+            lambda row: [args.keyword],
+            enricher,
+        )
+    print_saved(path, count)
+    print_details(enricher)
+
+
+async def run_parsers(args: argparse.Namespace) -> None:
+    if args.update:
+        golden.update()
+        return
+    if not golden.check(args.repeat):
+        raise SystemExit(1)
+
+
+def run_replay(args: argparse.Namespace) -> None:
+    cassette = Cassette(args.cassette)
+    with ReplayServer(cassette, make_faults(args), port=args.port) as server:
+        print(f"回放 {len(server.entries)} 个响应：{server.url}（Ctrl+C 停止）")
+        print(f"示例：uv run main.py sales --base-url {server.url} --no-cache")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            pass
+    print(f"共回放 {server.served} 次，注入错误 {server.injected} 次")
+
+
+def run_bench(args: argparse.Namespace) -> None:
+    options = dict(
+        sources=args.sources,
+        parsers=args.parsers,
+        faults=make_faults(args),
+        concurrency=args.concurrency,
+        retries=args.retries,
+    )
+    if args.cassette:
+        print(f"基准测试：回放 {args.cassette}")
+        results = bench.run(Cassette(args.cassette), **options)
+    else:
+        print(f"基准测试：golden 样本，每个数据源 {args.pages} 页")
+        results = bench.run_golden(args.pages, **options)
+    settings = {
+        "cassette": args.cassette,
+        "pages": None if args.cassette else args.pages,
+        "concurrency": args.concurrency,
+        "retries": args.retries,
+        "latency": args.latency,
+        "jitter": args.jitter,
+        "error_rate": args.error_rate,
+        "error_status": args.error_status,
+        "seed": args.seed,
+    }
+    path = output_path("基准测试", time.strftime("%Y%m%d_%H%M%S"), suffix=".json", dated=False)
+    bench.save(results, path, settings)
+    print(f"结果已保存到 {path}")
+    if args.compare:
+        bench.compare(results, Path(args.compare))
+
+
+def run_analytics(args: argparse.Namespace) -> None:
+    # pandas 是可选依赖，只在分析时导入
+    try:
+        from . import analytics
+    except ImportError as e:
+        raise SystemExit(f"分析需要安装 pandas：uv sync --extra analytics（{e}）") from e
+
+    aliases = json.loads(Path(args.aliases).read_text(encoding="utf-8")) if args.aliases else None
+    with analytics.Analytics(args.cache, aliases) as engine:
+        stats = engine.refresh(Path(args.input), rebuild=args.rebuild)
+        print(
+            f"读取 {stats.read} 个文件，{stats.unchanged} 个未变化，{stats.removed} 个已删除；"
+            f"重算 {len(stats.partitions)} 个（数据源, 月份）分区"
+            + ("（别名变化，全部重算）" if stats.rebuilt else "")
+        )
+        monthly = engine.monthly(args.level)
+        if args.brand:
+            monthly = monthly[monthly["brand"].isin(args.brand)]
+        if args.since:
+            monthly = monthly[monthly["month"] >= args.since]
+        if monthly.empty:
+            print(f"{args.input} 中没有可分析的数据")
+            return
+        trends = engine.trends(monthly, args.level)
+
+    suffix = f".{args.format}"
+    for name, frame in (("月度", monthly), ("趋势", trends)):
+        path = output_path("分析", name, args.level, suffix=suffix)
+        analytics.save(analytics.rename(frame), path, args.format)
+        print(f"{name}：{len(frame)} 行，已保存到 {path}")
+    if args.top:
+        print(analytics.rename(trends).head(args.top).to_string(index=False, float_format="%.2f"))
+
+
+def run_sweep(args: argparse.Namespace) -> None:
+    # 同步执行：进程池的工作进程各自运行事件循环，不能在已运行的事件循环中 fork
+    checkpoint = None if args.restart else sweep.Checkpoint.load(args.checkpoint)
+    if checkpoint is not None:
+        print(f"从断点继续：{checkpoint.path}，已完成 {len(checkpoint.done)} 项")
+    else:
+        checkpoint = sweep.Checkpoint(
+            args.checkpoint,
+            output_path("投诉", "全量"),
+            args.pages,
+            args.level,
+            args.format,
+            args.partition,
+        )
+        remove_output(checkpoint.output, checkpoint.fmt, checkpoint.partition_by)
+    base_url = args.base_url or zlts.BASE_URL
+
+    async def build() -> tuple[list[sweep.WorkItem], list[str]]:
+        async with make_fetcher(args) as fetcher:
+            return await sweep.build_work_list(fetcher, checkpoint.level, args.brand, base_url)
+
+    items, failed = asyncio.run(build())
+    options = sweep.FetchOptions(
+        concurrency=args.concurrency,
+        rate=args.rate,
+        retries=args.retries,
+        base_url=base_url,
+        parser=args.parser,
+        record=args.record,
+    )
+    written = sweep.run_sweep(
+        items, checkpoint, options, args.workers, args.chunk_size, args.chunk_rows
+    )
+    remaining = len({item.key for item in items} - checkpoint.done)
+    if remaining or failed:
+        print(
+            f"本次新增 {written} 条，仍有 {remaining} 项未完成、{len(failed)} 个查询失败，"
+            "重新运行可继续"
+        )
+        return
+    checkpoint.path.unlink(missing_ok=True)
+    print(f"全部完成，本次新增 {written} 条，已保存到 {checkpoint.target}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="car-crawler", description="汽车数据爬虫工具集")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    p = sub.add_parser("zlts", help="车质网投诉数据")
+    lookup = p.add_mutually_exclusive_group()
+    lookup.add_argument("--brands", action="store_true", help="列出所有可用品牌及其ID")
+    lookup.add_argument("--series", type=int, metavar="BRAND_ID", help="查询指定品牌的车系列表")
+    lookup.add_argument(
+        "--models", type=int, nargs=2, metavar=("BRAND_ID", "SERIES_ID"), help="查询指定车系的车型列表"
+    )
+    p.add_argument("--brand", type=int, default=0, help="品牌ID（0=全部品牌，默认：0）")
+    p.add_argument("--series-id", type=int, default=0, help="车系ID（0=全部车系，默认：0）")
+    p.add_argument("--model-id", type=int, default=0, help="车型ID（0=全部车型，默认：0）")
+    p.add_argument("--pages", type=int, default=5, help="抓取页数（默认：5）")
+    p.add_argument(
+        "--incremental", action="store_true", help="增量抓取：遇到已抓过的投诉即停止，只追加新数据"
+    )
+    p.add_argument(
+        "--index", default=str(SEEN_INDEX_PATH), help=f"增量索引文件（默认：{SEEN_INDEX_PATH}）"
+    )
+    add_fetch_args(p)
+    add_output_args(p)
+    add_details_args(p)
+    add_metrics_args(p)
+    p.set_defaults(handler=run_zlts)
+
+    p = sub.add_parser("sales", help="车主之家销量排行")
+    p.add_argument("--sales", action="store_true", help="查询销量排行（默认行为，兼容旧参数）")
+    p.add_argument("--pages", type=int, default=5, help="抓取页数（默认：5）")
+    add_fetch_args(p)
+    add_output_args(p)
+    add_metrics_args(p)
+    p.set_defaults(handler=run_sales)
+
+    p = sub.add_parser("recall", help="市场监管总局召回新闻")
+    p.add_argument("--keyword", default="", help="搜索关键词（品牌名、车型等）")
+    p.add_argument("--pages", type=int, default=5, help="抓取页数（默认：5）")
+    p.add_argument("--page-size", type=int, default=20, help="每页数量（默认：20）")
+    p.add_argument("--start-date", default="", help="起始日期（YYYY-MM-DD）")
+    p.add_argument("--end-date", default="", help="结束日期（YYYY-MM-DD）")
+    add_fetch_args(p)
+    add_output_args(p)
+    add_details_args(p)
+    add_metrics_args(p)
+    p.set_defaults(handler=run_recall)
+
+    p = sub.add_parser("sweep", help="多进程全量抓取所有品牌/车系的投诉（支持断点续抓）")
+    p.add_argument(
+        "--level", choices=sweep.LEVELS, default="series", help="工作项粒度（默认：series）"
+    )
+    p.add_argument("--brand", type=int, nargs="*", metavar="BRAND_ID", help="只抓取这些品牌（默认：全部）")
+    p.add_argument("--pages", type=int, default=5, help="每个工作项抓取页数（默认：5）")
+    p.add_argument("--workers", type=int, default=None, help="进程数（默认：CPU 核数）")
+    p.add_argument("--chunk-size", type=int, default=8, help="每块工作项数（默认：8）")
+    p.add_argument(
+        "--checkpoint",
+        default=str(sweep.DEFAULT_CHECKPOINT),
+        help=f"断点文件（默认：{sweep.DEFAULT_CHECKPOINT}）",
+    )
+    p.add_argument("--restart", action="store_true", help="忽略已有断点，从头开始")
+    add_fetch_args(p)
+    add_output_args(p)
+    add_metrics_args(p)
+    p.set_defaults(handler=run_sweep)
+
+    p = sub.add_parser("analytics", help="关联销量、投诉和召回：每万辆投诉、召回数和按月趋势")
+    p.add_argument("--input", default=str(OUT_DIR), help=f"抓取输出目录（默认：{OUT_DIR}）")
+    p.add_argument("--level", choices=("brand", "series"), default="series", help="统计粒度（默认：series）")
+    p.add_argument("--brand", nargs="+", metavar="品牌", help="只输出这些品牌（统一后的名称）")
+    p.add_argument("--since", default="", metavar="YYYY-MM", help="只输出此月份及之后的数据")
+    p.add_argument("--top", type=int, default=10, help="打印投诉数最多的前 N 项（默认：10，0=不打印）")
+    p.add_argument("--aliases", default=None, metavar="JSON", help="补充的品牌 / 车系别名文件")
+    p.add_argument(
+        "--cache",
+        default=str(OUT_DIR / "analytics.sqlite3"),
+        help="中间结果缓存（默认：out/analytics.sqlite3）",
+    )
+    p.add_argument("--rebuild", action="store_true", help="忽略缓存，重新读取所有文件")
+    p.add_argument("--format", choices=FORMATS, default="csv", help="输出格式（默认：csv）")
+    p.set_defaults(handler=run_analytics)
+
+    p = sub.add_parser("replay", help="在本地回放录制的响应，可注入延迟和错误")
+    p.add_argument("cassette", metavar="DIR", help="录制目录（抓取时用 --record 生成）")
+    p.add_argument("--port", type=int, default=REPLAY_PORT, help=f"监听端口（默认：{REPLAY_PORT}）")
+    add_fault_args(p)
+    p.set_defaults(handler=run_replay, latency=0.0, jitter=0.0)
+
+    p = sub.add_parser("bench", help="离线基准测试：各数据源 × 解析后端的吞吐、延迟和内存")
+    p.add_argument(
+        "--cassette", default=None, metavar="DIR", help="录制目录（默认：用 golden 样本合成）"
+    )
+    p.add_argument(
+        "--pages",
+        type=int,
+        default=bench.DEFAULT_PAGES,
+        help=f"用 golden 样本时每个数据源的页数（默认：{bench.DEFAULT_PAGES}）",
+    )
+    p.add_argument("--sources", choices=bench.SOURCES, nargs="+", default=list(bench.SOURCES))
+    p.add_argument("--parsers", choices=PARSERS, nargs="+", default=list(PARSERS))
+    p.add_argument("--concurrency", type=int, default=8, help="最大并发请求数（默认：8）")
+    p.add_argument("--retries", type=int, default=3, help="失败重试次数（默认：3）")
+    p.add_argument("--compare", default=None, metavar="JSON", help="与之前保存的基准结果对比")
+    add_fault_args(p)
+    p.set_defaults(handler=run_bench)
+
+    p = sub.add_parser("parsers", help="用 golden 样本检查各解析后端输出一致并测速")
+    p.add_argument("--repeat", type=int, default=50, help="每个样本重复解析次数（默认：50）")
+    p.add_argument("--update", action="store_true", help="用 bs4 后端重新生成期望结果")
+    p.set_defaults(handler=run_parsers)
+
+    return parser
+
+
+def run_handler(args: argparse.Namespace) -> None:
+    result = args.handler(args)
+    if inspect.iscoroutine(result):
+        asyncio.run(result)
+
+
+def run_instrumented(args: argparse.Namespace) -> None:
+    """运行抓取命令，结束时（包括出错中断）写出统计汇总和性能分析结果。"""
+    stamp = time.strftime("%Y%m%d_%H%M%S")
+    REGISTRY.reset()
+    server = serve(args.metrics_port) if args.metrics_port else None
+    if server is not None:
+        print(f"统计：http://127.0.0.1:{args.metrics_port}/metrics")
+    profiler = cProfile.Profile() if args.profile else None
+    try:
+        if profiler is not None:
+            profiler.enable()
+        run_handler(args)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+            path = output_path("性能分析", args.command, stamp, suffix=".prof", dated=False)
+            path.parent.mkdir(parents=True, exist_ok=True)
+            profiler.dump_stats(path)
+            pstats.Stats(profiler).sort_stats("cumulative").print_stats(20)
+            print(f"性能分析已保存到 {path}（可用 python -m pstats 或 snakeviz 查看）")
+        path = output_path("运行统计", args.command, stamp, suffix=".json", dated=False)
+        REGISTRY.write_summary(path)
+        for line in REGISTRY.report():
+            print(line)
+        print(f"统计汇总已保存到 {path}")
+        if server is not None:
+            server.shutdown()
+
+
+def main(argv: list[str] | None = None) -> None:
+    args = build_parser().parse_args(argv)
+    if hasattr(args, "profile"):
+        run_instrumented(args)
+    else:
+        run_handler(args)
@@ -0,0 +1,226 @@
+"""详情页补充：投诉正文、召回缺陷描述。
+
+列表页只给出详情链接，``--details`` 时按页补充详情字段：
+
+- 链接先在本次运行内去重，再查 :class:`DetailStore`，已抓过的链接直接复用，
+  不会重复请求；
+- 其余链接按批（``batch_size``）并发抓取，并发和限速沿用抓取器的设置；
+- 解析在进程池中进行，结果按链接和内容哈希存入 SQLite，内容相同的页面
+  （如转载、重定向到同一页）只解析一次；
+- 抓取失败或所有字段都没解析到内容（如验证码页、软错误页）的链接不存储，
+  记入 :attr:`DetailEnricher.failed`，下次运行重新抓取。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import re
+import sqlite3
+import time
+from collections.abc import Mapping
+from concurrent.futures import Executor
+from pathlib import Path
+
+from lxml import etree
+
+from .fetcher import AsyncFetcher
+from .output import OUT_DIR
+from .parsing import parse_html
+
+DEFAULT_PATH = OUT_DIR / "details.sqlite3"
+DEFAULT_BATCH_SIZE = 50
+
+# 数据源 -> 详情字段 -> 候选 XPath（按顺序取第一个有内容的）
+SELECTORS: dict[str, dict[str, list[etree.XPath]]] = {
+    "zlts": {
+        "投诉内容": [
+            etree.XPath("//div[contains(@class, 'tsnr')]"),
+            etree.XPath("//div[contains(@class, 'jbqk')]"),
+        ],
+        "厂家回复": [
+            etree.XPath("//div[contains(@class, 'hfnr')]"),
+            etree.XPath("//div[contains(@class, 'reply')]"),
+        ],
+    },
+    "recall": {
+        "缺陷描述": [
+            etree.XPath("//div[contains(@class, 'TRS_Editor')]"),
+            etree.XPath("//div[@id = 'content']"),
+            etree.XPath("//article"),
+        ],
+    },
+}
+
+_BLANK_LINES = re.compile(r"\n{2,}")
+
+
+def detail_fields(source: str) -> list[str]:
+    return list(SELECTORS[source])
+
+
+def _block_text(element: etree._Element) -> str:
+    lines = (line.strip() for line in element.itertext())
+    return _BLANK_LINES.sub("\n", "\n".join(line for line in lines if line))
+
+
+def _has_content(details: Mapping[str, str]) -> bool:
+    return any(details.values())
+
+
+def parse_detail(source: str, html: str) -> dict[str, str]:
+    """解析详情页（在进程池中运行，需为模块级函数）。"""
+    root = parse_html(html)
+    details = {}
+    for field, xpaths in SELECTORS[source].items():
+        details[field] = ""
+        if root is None:
+            continue
+        for xpath in xpaths:
+            found = xpath(root)
+            text = _block_text(found[0]) if found else ""
+            if text:
+                details[field] = text
+                break
+    return details
+
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS parsed (
+    content_hash TEXT PRIMARY KEY,
+    source TEXT NOT NULL,
+    details TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    url TEXT PRIMARY KEY,
+    content_hash TEXT NOT NULL REFERENCES parsed (content_hash),
+    fetched_at REAL NOT NULL
+);
+"""
+
+
+class DetailStore:
+    """已解析详情的 SQLite 存储：链接 -> 内容哈希 -> 详情字段。"""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> DetailStore:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def by_urls(self, urls: list[str]) -> dict[str, dict[str, str]]:
+        found = {}
+        for i in range(0, len(urls), 500):
+            batch = urls[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            for url, details in self.conn.execute(
+                "SELECT pages.url, parsed.details FROM pages "
+                "JOIN parsed ON parsed.content_hash = pages.content_hash "
+                f"WHERE pages.url IN ({placeholders})",
+                batch,
+            ):
+                found[url] = json.loads(details)
+        return found
+
+    def by_hash(self, content_hash: str) -> dict[str, str] | None:
+        row = self.conn.execute(
+            "SELECT details FROM parsed WHERE content_hash = ?", (content_hash,)
+        ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, url: str, content_hash: str, source: str, details: dict[str, str]) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO parsed (content_hash, source, details) VALUES (?, ?, ?)",
+                (content_hash, source, json.dumps(details, ensure_ascii=False)),
+            )
+            self.conn.execute(
+                "INSERT OR REPLACE INTO pages (url, content_hash, fetched_at) VALUES (?, ?, ?)",
+                (url, content_hash, time.time()),
+            )
+
+
+class DetailEnricher:
+    """为列表行补充详情字段。"""
+
+    def __init__(
+        self,
+        fetcher: AsyncFetcher,
+        store: DetailStore,
+        source: str,
+        link_field: str = "详情链接",
+        batch_size: int = DEFAULT_BATCH_SIZE,
+        executor: Executor | None = None,
+    ):
+        self.fetcher = fetcher
+        self.store = store
+        self.source = source
+        self.link_field = link_field
+        self.batch_size = max(1, batch_size)
+        self.executor = executor
+        self.fields = detail_fields(source)
+        self.fetched = 0
+        self.reused = 0
+        # 目前没有拿到详情的链接
+        self.failed: set[str] = set()
+
+    async def _parse(self, html: str) -> dict[str, str]:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self.executor, parse_detail, self.source, html)
+
+    async def _fetch_details(self, urls: list[str]) -> dict[str, dict[str, str]]:
+        found = {}
+        for i in range(0, len(urls), self.batch_size):
+            parsing = []
+            async for result in self.fetcher.fetch_many(urls[i : i + self.batch_size]):
+                if not result.ok:
+                    print(f"  详情抓取失败: {result.url} ({result.error or result.status})")
+                    continue
+                self.fetched += 1
+                content_hash = hashlib.sha256(result.content).hexdigest()
+                details = self.store.by_hash(content_hash)
+                if details is not None and _has_content(details):
+                    self.store.put(result.url, content_hash, self.source, details)
+                    found[result.url] = details
+                else:
+                    # 立即提交到进程池，解析与后续抓取并行
+                    parse = asyncio.ensure_future(self._parse(result.text))
+                    parsing.append((result.url, content_hash, parse))
+            results = await asyncio.gather(*(parse for _, _, parse in parsing))
+            for (url, content_hash, _), details in zip(parsing, results):
+                if not _has_content(details):
+                    print(f"  详情页没有解析到内容: {url}")
+                    continue
+                self.store.put(url, content_hash, self.source, details)
+                found[url] = details
+        return found
+
+    async def enrich(self, rows: list[Mapping[str, str]]) -> list[dict[str, str]]:
+        """返回补充了详情字段的新行。
+
+        没拿到详情的链接（抓取失败或没解析到内容）详情字段留空并记入
+        ``failed``；这些链接不会存入 :class:`DetailStore`，再次遇到时重新抓取。
+        """
+        urls = list(dict.fromkeys(row[self.link_field] for row in rows if row[self.link_field]))
+        found = self.store.by_urls(urls)
+        self.reused += len(found)
+        missing = [url for url in urls if url not in found]
+        if missing:
+            found.update(await self._fetch_details(missing))
+        for url in urls:
+            if url in found:
+                self.failed.discard(url)
+            else:
+                self.failed.add(url)
+        empty = dict.fromkeys(self.fields, "")
+        return [{**row, **found.get(row[self.link_field], empty)} for row in rows]
@@ -0,0 +1,289 @@
+"""异步并发抓取引擎。
+
+所有爬虫共用的下载层：一个带连接池的 aiohttp 会话、全局并发上限、
+按主机的速率限制，以及对超时/5xx/429 的指数退避重试。
+``fetch_many`` 按完成顺序逐个产出结果，调用方可以边下载边解析，
+整体耗时由速率限制决定，而不是由单次往返延迟决定。
+
+每次请求的耗时、DNS/建连耗时、限速等待、字节数、重试和状态码
+记入 :data:`car_crawler.metrics.REGISTRY`。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from collections.abc import AsyncIterator, Iterable
+from dataclasses import dataclass
+from typing import Any
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from .http_cache import CachedResponse, ResponseCache
+from .metrics import REGISTRY
+from .replay import Cassette
+
+DEFAULT_HEADERS = {
+    "User-Agent": (
+        "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 "
+        "(KHTML, like Gecko) Chrome/120.0 Safari/537.36"
+    ),
+    "Accept-Language": "zh-CN,zh;q=0.9",
+}
+
+# 这些状态码视为临时错误，会重试
+RETRY_STATUSES = frozenset({429, 500, 502, 503, 504})
+
+
+@dataclass
+class FetchResult:
+    """一次抓取的结果（重试结束后的最终状态）。"""
+
+    url: str
+    status: int
+    content: bytes
+    encoding: str
+    elapsed: float
+    attempts: int
+    meta: Any = None
+    error: str | None = None
+    from_cache: bool = False
+    # 最后一次请求本身的耗时，不含限速等待和重试退避（与 http_request_seconds 一致）
+    request_seconds: float = 0.0
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None and 200 <= self.status < 300
+
+    @property
+    def text(self) -> str:
+        return self.content.decode(self.encoding, errors="replace")
+
+
+class RateLimiter:
+    """按主机的最小请求间隔限速。
+
+    ``rate`` 为每个主机每秒最多发起的请求数，``rate <= 0`` 表示不限速。
+    """
+
+    def __init__(self, rate: float):
+        self.interval = 1.0 / rate if rate > 0 else 0.0
+        self._next: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+    async def acquire(self, host: str) -> float:
+        """等到 ``host`` 的下一个请求时隙，返回等待的秒数。"""
+        if not self.interval:
+            return 0.0
+        lock = self._locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next.get(host, now))
+            self._next[host] = slot + self.interval
+        delay = slot - now
+        if delay > 0:
+            await asyncio.sleep(delay)
+        return max(delay, 0.0)
+
+
+def _trace_config() -> aiohttp.TraceConfig:
+    """记录 DNS 解析和建立连接的耗时（复用连接池中的连接时不会触发）。"""
+
+    async def dns_start(session, ctx, params):
+        ctx.dns_start = time.perf_counter()
+
+    async def dns_end(session, ctx, params):
+        REGISTRY.observe("dns_seconds", time.perf_counter() - ctx.dns_start, host=params.host)
+
+    async def connect_start(session, ctx, params):
+        ctx.connect_start = time.perf_counter()
+
+    async def connect_end(session, ctx, params):
+        REGISTRY.observe("connect_seconds", time.perf_counter() - ctx.connect_start)
+
+    config = aiohttp.TraceConfig()
+    config.on_dns_resolvehost_start.append(dns_start)
+    config.on_dns_resolvehost_end.append(dns_end)
+    config.on_connection_create_start.append(connect_start)
+    config.on_connection_create_end.append(connect_end)
+    return config
+
+
+class AsyncFetcher:
+    """带连接池、并发上限、限速和重试的异步抓取器。
+
+    用法::
+
+        async with AsyncFetcher(concurrency=8, rate=4) as fetcher:
+            async for result in fetcher.fetch_many(urls):
+                ...
+
+    传入的 ``cache`` 归抓取器所有，退出 ``async with`` 时随会话一起关闭。
+    """
+
+    def __init__(
+        self,
+        concurrency: int = 8,
+        rate: float = 2.0,
+        retries: int = 3,
+        backoff: float = 0.5,
+        timeout: float = 20.0,
+        headers: dict[str, str] | None = None,
+        cache: ResponseCache | None = None,
+        recorder: Cassette | None = None,
+    ):
+        self.concurrency = max(1, concurrency)
+        self.retries = max(0, retries)
+        self.backoff = backoff
+        self.timeout = aiohttp.ClientTimeout(total=timeout)
+        self.headers = {**DEFAULT_HEADERS, **(headers or {})}
+        self.limiter = RateLimiter(rate)
+        self.cache = cache
+        self.recorder = recorder
+        self._semaphore = asyncio.Semaphore(self.concurrency)
+        self._session: aiohttp.ClientSession | None = None
+
+    async def __aenter__(self) -> AsyncFetcher:
+        connector = aiohttp.TCPConnector(limit=self.concurrency, ttl_dns_cache=300)
+        self._session = aiohttp.ClientSession(
+            connector=connector,
+            timeout=self.timeout,
+            headers=self.headers,
+            trace_configs=[_trace_config()],
+        )
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def _retry_delay(self, attempt: int, retry_after: str | None = None) -> float:
+        if retry_after and retry_after.isdigit():
+            return float(retry_after)
+        return self.backoff * (2 ** (attempt - 1)) + random.uniform(0, self.backoff)
+
+    async def fetch(self, url: str, meta: Any = None, ttl: float | None = None) -> FetchResult:
+        """抓取单个 URL；临时错误按指数退避重试，最终失败时 ``error`` 非空。
+
+        ``ttl`` 不为 ``None`` 且配置了缓存时走响应缓存：TTL 内直接返回缓存，
+        过期后发条件请求，304 时沿用缓存内容。配置了 ``recorder`` 时
+        成功的响应（包括来自缓存的）会被录制下来。
+        """
+        result = await self._fetch(url, meta, ttl)
+        if self.recorder is not None and result.ok:
+            self.recorder.record(url, result.status, result.encoding, result.content)
+        return result
+
+    async def _fetch(self, url: str, meta: Any, ttl: float | None) -> FetchResult:
+        if self._session is None:
+            raise RuntimeError("AsyncFetcher 需在 async with 中使用")
+        start = time.monotonic()
+        cached = self.cache.get(url) if self.cache is not None and ttl is not None else None
+        if cached is not None and cached.fresh(ttl):
+            REGISTRY.inc("cache_hits_total", result="fresh")
+            return self._from_cache(cached, meta, start, attempts=0)
+        request_headers = cached.validators() if cached is not None else None
+        host = urlsplit(url).netloc
+        attempt = 0
+        while True:
+            attempt += 1
+            retry_after = None
+            # 先等限速时隙再占并发名额：限速主机排队的请求不能占满名额、挡住其他主机
+            waited = await self.limiter.acquire(host)
+            REGISTRY.observe("rate_limit_wait_seconds", waited, host=host)
+            async with self._semaphore:
+                sent = time.perf_counter()
+                try:
+                    async with self._session.get(url, headers=request_headers) as resp:
+                        content = await resp.read()
+                        status = resp.status
+                        encoding = resp.get_encoding() if content else "utf-8"
+                        retry_after = resp.headers.get("Retry-After")
+                        etag = resp.headers.get("ETag")
+                        last_modified = resp.headers.get("Last-Modified")
+                    error = None if status not in RETRY_STATUSES else f"HTTP {status}"
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    status, content, encoding = 0, b"", "utf-8"
+                    error = f"{type(e).__name__}: {e}"
+                    REGISTRY.inc("http_errors_total", type=type(e).__name__)
+                request_seconds = time.perf_counter() - sent
+                REGISTRY.observe("http_request_seconds", request_seconds, host=host)
+            if status:
+                REGISTRY.inc("http_responses_total", status=str(status))
+                REGISTRY.inc("http_response_bytes_total", len(content), host=host)
+            if error is None and status == 304 and cached is not None:
+                REGISTRY.inc("cache_hits_total", result="revalidated")
+                self.cache.touch(url)
+                return self._from_cache(cached, meta, start, attempts=attempt)
+            if error is None and ttl is not None and self.cache is not None and 200 <= status < 300:
+                self.cache.put(url, status, encoding, content, etag, last_modified)
+            if error is None or attempt > self.retries:
+                return FetchResult(
+                    url=url,
+                    status=status,
+                    content=content,
+                    encoding=encoding,
+                    elapsed=time.monotonic() - start,
+                    attempts=attempt,
+                    meta=meta,
+                    error=error,
+                    request_seconds=request_seconds,
+                )
+            REGISTRY.inc("http_retries_total", host=host)
+            await asyncio.sleep(self._retry_delay(attempt, retry_after))
+
+    @staticmethod
+    def _from_cache(
+        cached: CachedResponse, meta: Any, start: float, attempts: int
+    ) -> FetchResult:
+        return FetchResult(
+            url=cached.url,
+            status=cached.status,
+            content=cached.body,
+            encoding=cached.encoding,
+            elapsed=time.monotonic() - start,
+            attempts=attempts,
+            meta=meta,
+            from_cache=True,
+        )
+
+    async def fetch_many(
+        self, requests: Iterable[str | tuple[str, Any]], ttl: float | None = None
+    ) -> AsyncIterator[FetchResult]:
+        """并发抓取一批 URL，按完成顺序产出结果。
+
+        ``requests`` 的元素可以是 URL，也可以是 ``(url, meta)``，
+        ``meta`` 原样带回 ``FetchResult.meta``（例如页码）；``ttl`` 同 :meth:`fetch`。
+        同时在途的请求不超过 ``concurrency`` 个；调用方提前退出循环时，
+        未完成的请求会被取消。
+        """
+        pending: set[asyncio.Task] = set()
+        queue = iter(requests)
+
+        def schedule() -> bool:
+            item = next(queue, None)
+            if item is None:
+                return False
+            url, meta = (item, None) if isinstance(item, str) else item
+            pending.add(asyncio.ensure_future(self.fetch(url, meta, ttl)))
+            return True
+
+        try:
+            while len(pending) < self.concurrency and schedule():
+                pass
+            while pending:
+                done, _ = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    pending.discard(task)
+                    schedule()
+                    yield task.result()
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
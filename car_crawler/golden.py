@@ -0,0 +1,65 @@
+"""解析后端的 golden 样本检查与离线测速。
+
+``fixtures/golden/`` 下每个 ``<数据源>_*.html`` 都配有同名 ``.json``，
+内容是期望解析出的行。检查时每个后端的输出都必须与之完全一致，
+同时统计每页的平均解析耗时。``--update`` 用 bs4 后端重新生成期望结果。
+"""
+
+from __future__ import annotations
+
+import json
+import time
+from collections.abc import Callable
+from pathlib import Path
+
+from . import recall, sales, zlts
+from .parsing import PARSERS, Record
+
+FIXTURE_DIR = Path(__file__).parent / "fixtures" / "golden"
+
+# 数据源 -> 解析函数 (html, parser) -> 行列表
+SOURCES: dict[str, Callable[[str, str], list[Record]]] = {
+    "zlts": lambda html, parser: zlts.parse_list_page(html, parser=parser),
+    "sales": lambda html, parser: sales.parse_list_page(html, parser=parser),
+    "recall": lambda html, parser: recall.parse_list_page(html, parser=parser),
+}
+
+
+def fixtures() -> list[Path]:
+    return sorted(FIXTURE_DIR.glob("*.html"))
+
+
+def parse_fixture(path: Path, parser: str) -> list[dict]:
+    source = path.stem.split("_", 1)[0]
+    return [dict(row) for row in SOURCES[source](path.read_text(encoding="utf-8"), parser)]
+
+
+def update() -> None:
+    for path in fixtures():
+        rows = parse_fixture(path, "bs4")
+        path.with_suffix(".json").write_text(
+            json.dumps(rows, ensure_ascii=False, indent=1) + "\n", encoding="utf-8"
+        )
+        print(f"{path.name}: {len(rows)} 行")
+
+
+def check(repeat: int = 50) -> bool:
+    """逐个样本、逐个后端对照期望结果并测速，全部一致时返回 True。"""
+    ok = True
+    print(f"{'样本':<20}" + "".join(f"{p + ' ms/页':>14}" for p in PARSERS) + "  结果")
+    for path in fixtures():
+        expected = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+        html = path.read_text(encoding="utf-8")
+        source = path.stem.split("_", 1)[0]
+        timings, failures = [], []
+        for parser in PARSERS:
+            if parse_fixture(path, parser) != expected:
+                failures.append(parser)
+            start = time.perf_counter()
+            for _ in range(repeat):
+                SOURCES[source](html, parser)
+            timings.append((time.perf_counter() - start) / repeat * 1000)
+        ok = ok and not failures
+        status = "一致" if not failures else "不一致: " + ", ".join(failures)
+        print(f"{path.name:<20}" + "".join(f"{t:>14.3f}" for t in timings) + f"  {status}")
+    return ok
@@ -0,0 +1,138 @@
+"""支持条件请求的磁盘响应缓存（SQLite，LRU 淘汰）。
+
+缓存项在 TTL 内直接返回、不发请求；过期后带 ``If-None-Match`` /
+``If-Modified-Since`` 重新验证，服务器返回 304 时沿用缓存内容并刷新时间。
+总大小超过上限时按最近访问时间淘汰。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from .output import OUT_DIR
+
+DEFAULT_PATH = OUT_DIR / "http_cache.sqlite3"
+DEFAULT_MAX_BYTES = 200 * 1024 * 1024
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS responses (
+    url TEXT PRIMARY KEY,
+    status INTEGER NOT NULL,
+    encoding TEXT NOT NULL,
+    etag TEXT,
+    last_modified TEXT,
+    body BLOB NOT NULL,
+    size INTEGER NOT NULL,
+    stored_at REAL NOT NULL,
+    accessed_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed_at);
+"""
+
+
+@dataclass
+class CachedResponse:
+    url: str
+    status: int
+    encoding: str
+    etag: str | None
+    last_modified: str | None
+    body: bytes
+    stored_at: float
+
+    def fresh(self, ttl: float) -> bool:
+        return time.time() - self.stored_at < ttl
+
+    def validators(self) -> dict[str, str]:
+        """重新验证时附带的条件请求头。"""
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+class ResponseCache:
+    """按 URL 缓存成功响应，超出 ``max_bytes`` 时淘汰最久未访问的项。"""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH, max_bytes: int = DEFAULT_MAX_BYTES):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> ResponseCache:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def get(self, url: str) -> CachedResponse | None:
+        row = self.conn.execute(
+            "SELECT status, encoding, etag, last_modified, body, stored_at "
+            "FROM responses WHERE url = ?",
+            (url,),
+        ).fetchone()
+        if row is None:
+            return None
+        with self.conn:
+            self.conn.execute(
+                "UPDATE responses SET accessed_at = ? WHERE url = ?", (time.time(), url)
+            )
+        return CachedResponse(url, *row)
+
+    def put(
+        self,
+        url: str,
+        status: int,
+        encoding: str,
+        body: bytes,
+        etag: str | None = None,
+        last_modified: str | None = None,
+    ) -> None:
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO responses "
+                "(url, status, encoding, etag, last_modified, body, size, stored_at, accessed_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (url, status, encoding, etag, last_modified, body, len(body), now, now),
+            )
+        self.evict()
+
+    def touch(self, url: str) -> None:
+        """304 后刷新缓存项的存储时间，重新开始计算 TTL。"""
+        now = time.time()
+        with self.conn:
+            self.conn.execute(
+                "UPDATE responses SET stored_at = ?, accessed_at = ? WHERE url = ?",
+                (now, now, url),
+            )
+
+    def total_bytes(self) -> int:
+        return self.conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    def evict(self) -> int:
+        """按 LRU 淘汰直到总大小不超过上限，返回淘汰的条数。"""
+        excess = self.total_bytes() - self.max_bytes
+        if excess <= 0:
+            return 0
+        victims = []
+        for url, size in self.conn.execute(
+            "SELECT url, size FROM responses ORDER BY accessed_at"
+        ):
+            victims.append((url,))
+            excess -= size
+            if excess <= 0:
+                break
+        with self.conn:
+            self.conn.executemany("DELETE FROM responses WHERE url = ?", victims)
+        return len(victims)
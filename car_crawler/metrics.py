@@ -0,0 +1,245 @@
+"""抓取过程的统计：计数器与耗时直方图。
+
+所有爬虫共用进程内的 :data:`REGISTRY`：抓取器记录请求耗时、DNS/建连耗时、
+限速等待、字节数、重试和状态码，各数据源记录每页解析耗时，写入器记录写出耗时。
+运行结束时写出 JSON 汇总；也可以用 :func:`serve` 以 Prometheus 文本格式暴露。
+多进程全量抓取时，工作进程把 :meth:`Metrics.snapshot` 交回主进程合并。
+"""
+
+from __future__ import annotations
+
+import bisect
+import json
+import threading
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 秒；覆盖从本地缓存命中到慢速服务器的范围
+DEFAULT_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0
+)
+
+LabelKey = tuple[tuple[str, str], ...]
+
+
+def _label_key(labels: dict[str, str]) -> LabelKey:
+    return tuple(sorted((k, str(v)) for k, v in labels.items()))
+
+
+def _summary_key(key: LabelKey) -> str:
+    return ",".join(f"{k}={v}" for k, v in key) or "total"
+
+
+def _format_labels(key: LabelKey, extra: str = "") -> str:
+    parts = [f'{k}="{v}"' for k, v in key]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+class Histogram:
+    """固定桶的直方图，分位数按桶内线性插值估算。"""
+
+    def __init__(self, buckets: tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def merge(self, counts: list[int], total: float) -> None:
+        for i, n in enumerate(counts):
+            self.counts[i] += n
+        self.count += sum(counts)
+        self.sum += total
+
+    def quantile(self, q: float) -> float:
+        if not self.count:
+            return 0.0
+        rank = q * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            if seen + n >= rank and n:
+                lower = self.buckets[i - 1] if i > 0 else 0.0
+                upper = self.buckets[i] if i < len(self.buckets) else self.buckets[-1]
+                return lower + (upper - lower) * (rank - seen) / n
+            seen += n
+        return self.buckets[-1]
+
+    def summary(self) -> dict[str, float]:
+        return {
+            "count": self.count,
+            "sum": round(self.sum, 6),
+            "mean": round(self.sum / self.count, 6) if self.count else 0.0,
+            "p50": round(self.quantile(0.5), 6),
+            "p90": round(self.quantile(0.9), 6),
+            "p99": round(self.quantile(0.99), 6),
+        }
+
+
+class Metrics:
+    """带标签的计数器和直方图集合（线程安全）。"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.counters: dict[str, dict[LabelKey, float]] = {}
+        self.histograms: dict[str, dict[LabelKey, Histogram]] = {}
+        self.started = time.time()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.counters.clear()
+            self.histograms.clear()
+            self.started = time.time()
+
+    def inc(self, name: str, value: float = 1, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + value
+
+    def observe(self, name: str, value: float, **labels: str) -> None:
+        key = _label_key(labels)
+        with self._lock:
+            series = self.histograms.setdefault(name, {})
+            if key not in series:
+                series[key] = Histogram()
+            series[key].observe(value)
+
+    @contextmanager
+    def timer(self, name: str, **labels: str) -> Iterator[None]:
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self) -> dict:
+        """可 pickle 的原始数据，用于跨进程合并。"""
+        with self._lock:
+            return {
+                "counters": {n: dict(s) for n, s in self.counters.items()},
+                "histograms": {
+                    n: {k: (list(h.counts), h.sum) for k, h in s.items()}
+                    for n, s in self.histograms.items()
+                },
+            }
+
+    def merge(self, snapshot: dict) -> None:
+        with self._lock:
+            for name, series in snapshot["counters"].items():
+                target = self.counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0) + value
+            for name, series in snapshot["histograms"].items():
+                target = self.histograms.setdefault(name, {})
+                for key, (counts, total) in series.items():
+                    target.setdefault(key, Histogram()).merge(counts, total)
+
+    def summary(self) -> dict:
+        """JSON 汇总：计数器原值，直方图给出次数、总和、均值和分位数。"""
+        with self._lock:
+            return {
+                "elapsed_seconds": round(time.time() - self.started, 3),
+                "counters": {
+                    name: {_summary_key(k): v for k, v in sorted(series.items())}
+                    for name, series in sorted(self.counters.items())
+                },
+                "histograms": {
+                    name: {_summary_key(k): h.summary() for k, h in sorted(series.items())}
+                    for name, series in sorted(self.histograms.items())
+                },
+            }
+
+    def write_summary(self, path: Path) -> None:
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(
+            json.dumps(self.summary(), ensure_ascii=False, indent=2) + "\n", encoding="utf-8"
+        )
+
+    def prometheus(self) -> str:
+        """Prometheus 文本格式。"""
+        lines = []
+        with self._lock:
+            for name, series in sorted(self.counters.items()):
+                lines.append(f"# TYPE car_crawler_{name} counter")
+                for key, value in sorted(series.items()):
+                    lines.append(f"car_crawler_{name}{_format_labels(key)} {value:g}")
+            for name, series in sorted(self.histograms.items()):
+                lines.append(f"# TYPE car_crawler_{name} histogram")
+                for key, h in sorted(series.items()):
+                    cumulative = 0
+                    for bound, n in zip((*h.buckets, float("inf")), h.counts):
+                        cumulative += n
+                        le = "+Inf" if bound == float("inf") else f"{bound:g}"
+                        labels = _format_labels(key, f'le="{le}"')
+                        lines.append(f"car_crawler_{name}_bucket{labels} {cumulative}")
+                    lines.append(f"car_crawler_{name}_sum{_format_labels(key)} {h.sum:g}")
+                    lines.append(f"car_crawler_{name}_count{_format_labels(key)} {h.count}")
+        return "\n".join(lines) + "\n"
+
+    def total(self, name: str) -> float:
+        """计数器各标签之和。"""
+        with self._lock:
+            return sum(self.counters.get(name, {}).values())
+
+    def histogram(self, name: str) -> Histogram:
+        """合并各标签后的直方图。"""
+        h = Histogram()
+        with self._lock:
+            for series in self.histograms.get(name, {}).values():
+                h.merge(series.counts, series.sum)
+        return h
+
+    def report(self) -> list[str]:
+        """运行结束时在终端打印的要点。"""
+        total, merged = self.total, self.histogram
+        requests = merged("http_request_seconds")
+        with self._lock:
+            statuses = {}
+            for key, n in self.counters.get("http_responses_total", {}).items():
+                status = dict(key).get("status", "?")
+                statuses[status] = statuses.get(status, 0) + n
+        return [
+            f"请求 {requests.count} 次，p50 {requests.quantile(0.5) * 1000:.0f} ms，"
+            f"p99 {requests.quantile(0.99) * 1000:.0f} ms，"
+            f"下载 {total('http_response_bytes_total') / 1024 / 1024:.2f} MB，"
+            f"重试 {total('http_retries_total'):g} 次，缓存命中 {total('cache_hits_total'):g} 次",
+            "状态码 " + ", ".join(f"{s}: {n:g}" for s, n in sorted(statuses.items())),
+            f"DNS {merged('dns_seconds').sum:.2f} s，建连 {merged('connect_seconds').sum:.2f} s，"
+            f"限速等待 {merged('rate_limit_wait_seconds').sum:.2f} s，"
+            f"解析 {merged('parse_seconds').sum:.2f} s，写出 {merged('write_seconds').sum:.2f} s",
+        ]
+
+
+REGISTRY = Metrics()
+
+
+def serve(port: int, metrics: Metrics = REGISTRY, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    """在后台线程中提供 ``http://host:port/metrics``，返回服务器（``shutdown()`` 停止）。"""
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.rstrip("/") != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics.prometheus().encode()
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    server = ThreadingHTTPServer((host, port), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,30 @@
+"""输出文件命名。写出见 :mod:`car_crawler.writers`。"""
+
+from __future__ import annotations
+
+import re
+from datetime import date
+from pathlib import Path
+
+OUT_DIR = Path("out")
+
+_UNSAFE = re.compile(r'[\\/:*?"<>|\s]+')
+
+
+def safe_name(name: str) -> str:
+    """去掉不能出现在文件名里的字符和空白。"""
+    return _UNSAFE.sub("", name)
+
+
+def output_path(
+    prefix: str, *parts: str, suffix: str = "", out_dir: Path = OUT_DIR, dated: bool = True
+) -> Path:
+    """按 ``[前缀]_[部分...]_[日期]`` 生成输出路径，空的部分会被跳过。
+
+    ``dated=False`` 时不带日期，用于增量抓取持续追加的文件。
+    """
+    parts = [safe_name(p) for p in parts if p]
+    if dated:
+        parts.append(date.today().strftime("%Y%m%d"))
+    name = "_".join([prefix, *(p for p in parts if p)])
+    return out_dir / f"{name}{suffix}"
@@ -0,0 +1,212 @@
+"""列表页解析后端与行记录。
+
+有两个解析后端：
+
+- ``lxml``（默认）：直接用 lxml 建树，配合预编译的 XPath，逐行产出记录；
+- ``bs4``：原来的 BeautifulSoup 实现，作为兼容回退。
+
+两个后端的输出必须完全一致，由 ``main.py parsers`` 对照 golden 样本检查。
+行记录是带 ``__slots__`` 的只读映射，可以直接当 dict 用（``row["字段"]``、
+``csv.DictWriter``），但比 dict 省内存。
+"""
+
+from __future__ import annotations
+
+import warnings
+from collections.abc import Iterator, Mapping
+from urllib.parse import urljoin
+
+from bs4 import BeautifulSoup, XMLParsedAsHTMLWarning
+from lxml import etree
+
+PARSERS = ("lxml", "bs4")
+DEFAULT_PARSER = "lxml"
+
+_HTML_PARSER = etree.HTMLParser()
+# 已解码的文本统一转成 UTF-8 字节交给 libxml2：lxml 不接受带编码声明的
+# 字符串（如 ``<?xml ... encoding="gbk"?>``），显式编码也让页面里的声明失效
+_UTF8_HTML_PARSER = etree.HTMLParser(encoding="utf-8")
+_TABLES = etree.XPath("//table")
+# 与 BeautifulSoup 的 find_all 一样按子孙节点查找，保证两个后端结果一致
+_ROWS = etree.XPath(".//tr")
+_HEADER_CELLS = etree.XPath(".//th | .//td")
+_CELLS = etree.XPath(".//td")
+_FIRST_LINK = etree.XPath("(.//a[@href])[1]")
+# 只取文本节点（不含注释），并跳过脚本和样式，与 BeautifulSoup 的 get_text 一致
+_TEXTS = etree.XPath("descendant-or-self::text()[not(parent::script or parent::style)]")
+
+
+class Record(Mapping):
+    """``__slots__`` 行记录的基类，子类由 :func:`record_type` 生成。"""
+
+    __slots__ = ()
+    fields: tuple[str, ...] = ()
+
+    def __init__(self, *values: str):
+        for field, value in zip(self.fields, values):
+            object.__setattr__(self, field, value)
+
+    def __getitem__(self, key: str) -> str:
+        if key not in self.fields:
+            raise KeyError(key)
+        return getattr(self, key, "")
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.fields)
+
+    def __len__(self) -> int:
+        return len(self.fields)
+
+    def __setattr__(self, name: str, value: object) -> None:
+        raise AttributeError(f"{type(self).__name__} 是只读记录")
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}({dict(self)!r})"
+
+    def __reduce__(self):
+        # 记录类是动态生成的，按名称和字段重建，才能跨进程传递
+        return _rebuild_record, (type(self).__name__, self.fields, tuple(self.values()))
+
+
+_RECORD_TYPES: dict[tuple[str, tuple[str, ...]], type[Record]] = {}
+
+
+def record_type(name: str, fields: list[str] | tuple[str, ...]) -> type[Record]:
+    """生成（并缓存）字段为 ``fields`` 的记录类。"""
+    key = (name, tuple(fields))
+    if key not in _RECORD_TYPES:
+        _RECORD_TYPES[key] = type(name, (Record,), {"__slots__": key[1], "fields": key[1]})
+    return _RECORD_TYPES[key]
+
+
+def _rebuild_record(name: str, fields: tuple[str, ...], values: tuple[str, ...]) -> Record:
+    return record_type(name, fields)(*values)
+
+
+def text_of(element: etree._Element) -> str:
+    """与 BeautifulSoup ``get_text(strip=True)`` 一致：逐段去空白后拼接。"""
+    return "".join(s.strip() for s in _TEXTS(element))
+
+
+def parse_html(html: str | bytes) -> etree._Element | None:
+    """用 lxml 解析 HTML；调用方应传入已解码的文本，避免 libxml2 误判编码。"""
+    if not html:
+        return None
+    if isinstance(html, str):
+        return etree.fromstring(html.encode("utf-8"), _UTF8_HTML_PARSER)
+    return etree.fromstring(html, _HTML_PARSER)
+
+
+def make_soup(html: str | bytes) -> BeautifulSoup:
+    """bs4 后端的解析入口。有的页面以 ``<?xml ...?>`` 声明开头，但仍按 HTML 解析，不提示警告。"""
+    with warnings.catch_warnings():
+        warnings.simplefilter("ignore", XMLParsedAsHTMLWarning)
+        return BeautifulSoup(html, "lxml")
+
+
+def _match_columns(headers: list[str], fields: list[str]) -> dict[str, int]:
+    columns = {}
+    for field in fields:
+        for i, header in enumerate(headers):
+            if field in header:
+                columns[field] = i
+                break
+    return columns
+
+
+def _iter_table_lxml(
+    html: str | bytes,
+    fields: list[str],
+    record: type[Record],
+    link_field: str | None,
+    link_from: str | None,
+    base_url: str,
+) -> Iterator[Record]:
+    root = parse_html(html)
+    if root is None:
+        return
+    best_rows, best_columns = None, {}
+    for table in _TABLES(root):
+        rows = _ROWS(table)
+        if not rows:
+            continue
+        headers = [text_of(cell) for cell in _HEADER_CELLS(rows[0])]
+        columns = _match_columns(headers, fields)
+        if len(columns) > len(best_columns):
+            best_rows, best_columns = rows, columns
+    if best_rows is None:
+        return
+
+    for tr in best_rows[1:]:
+        cells = _CELLS(tr)
+        if not cells:
+            continue
+        values = []
+        for field in fields:
+            if field == link_field:
+                link = None
+                i = best_columns.get(link_from)
+                if i is not None and i < len(cells):
+                    links = _FIRST_LINK(cells[i])
+                    link = links[0] if links else None
+                values.append(urljoin(base_url, link.get("href")) if link is not None else "")
+            else:
+                i = best_columns.get(field)
+                values.append(text_of(cells[i]) if i is not None and i < len(cells) else "")
+        yield record(*values)
+
+
+def _iter_table_bs4(
+    html: str | bytes,
+    fields: list[str],
+    record: type[Record],
+    link_field: str | None,
+    link_from: str | None,
+    base_url: str,
+) -> Iterator[Record]:
+    soup = make_soup(html)
+    best, best_columns = None, {}
+    for table in soup.find_all("table"):
+        header_row = table.find("tr")
+        if header_row is None:
+            continue
+        headers = [cell.get_text(strip=True) for cell in header_row.find_all(["th", "td"])]
+        columns = _match_columns(headers, fields)
+        if len(columns) > len(best_columns):
+            best, best_columns = table, columns
+    if best is None:
+        return
+
+    for tr in best.find_all("tr")[1:]:
+        cells = tr.find_all("td")
+        if not cells:
+            continue
+        row = {
+            field: cells[i].get_text(strip=True) if i < len(cells) else ""
+            for field, i in best_columns.items()
+        }
+        if link_field:
+            link = None
+            if link_from in best_columns and best_columns[link_from] < len(cells):
+                link = cells[best_columns[link_from]].find("a", href=True)
+            row[link_field] = urljoin(base_url, link["href"]) if link else ""
+        yield record(*(row.get(field, "") for field in fields))
+
+
+def iter_table(
+    html: str | bytes,
+    fields: list[str],
+    record: type[Record],
+    link_field: str | None = None,
+    link_from: str | None = None,
+    base_url: str = "",
+    parser: str = DEFAULT_PARSER,
+) -> Iterator[Record]:
+    """逐行解析页面中表头匹配字段最多的表格。
+
+    按表头文字定位各列，表头里包含字段名即视为匹配（例如“销量(辆)”
+    对应“销量”），缺失的列留空。``link_from`` 列中第一个链接的地址
+    （补全为绝对 URL）写入 ``link_field``。
+    """
+    iterate = _iter_table_lxml if parser == "lxml" else _iter_table_bs4
+    return iterate(html, fields, record, link_field, link_from, base_url)
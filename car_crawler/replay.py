@@ -0,0 +1,186 @@
+"""响应录制与本地回放服务器，用于离线测试和基准测试。
+
+录制：抓取命令加 ``--record DIR`` 时，抓取器把每个成功的响应写入录制目录::
+
+    DIR/index.jsonl          每行一个响应：URL、路径、状态码、编码、正文文件
+    DIR/bodies/<sha256>      正文（按内容哈希存放，相同内容只存一份）
+
+``index.jsonl`` 只追加，同一路径以最后一条为准；多个进程可以同时录制到同一目录。
+
+回放：:class:`ReplayServer` 按请求的路径和查询串返回录制的响应，不区分主机，
+所以抓取命令用 ``--base-url`` 指向它即可。可以注入固定延迟、随机抖动和
+按比例返回的错误状态码，用来模拟慢速或不稳定的站点。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import hashlib
+import json
+import os
+import random
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+
+from aiohttp import web
+from yarl import URL
+
+from .output import OUT_DIR
+
+DEFAULT_DIR = OUT_DIR / "recordings"
+DEFAULT_PORT = 8800
+
+
+def request_key(url: str) -> str:
+    """回放时用于匹配的键：编码后的路径和查询串。"""
+    return URL(url).raw_path_qs
+
+
+@dataclass
+class Recorded:
+    url: str
+    status: int
+    encoding: str
+    body: str
+
+    @property
+    def key(self) -> str:
+        return request_key(self.url)
+
+
+class Cassette:
+    """录制目录。"""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.index = self.path / "index.jsonl"
+        self.bodies = self.path / "bodies"
+
+    def record(self, url: str, status: int, encoding: str, content: bytes) -> None:
+        self.bodies.mkdir(parents=True, exist_ok=True)
+        body = hashlib.sha256(content).hexdigest()
+        target = self.bodies / body
+        if not target.exists():
+            tmp = target.with_name(f"{body}.{os.getpid()}.tmp")
+            tmp.write_bytes(content)
+            os.replace(tmp, target)
+        line = json.dumps(
+            {"url": url, "status": status, "encoding": encoding, "body": body}, ensure_ascii=False
+        )
+        # 单行追加写，多个进程同时录制也不会交错
+        with open(self.index, "a", encoding="utf-8") as f:
+            f.write(line + "\n")
+
+    def entries(self) -> dict[str, Recorded]:
+        """路径和查询串 -> 最后一次录制的响应。"""
+        found = {}
+        if self.index.exists():
+            with open(self.index, encoding="utf-8") as f:
+                for line in f:
+                    entry = Recorded(**json.loads(line))
+                    found[entry.key] = entry
+        return found
+
+    def content(self, entry: Recorded) -> bytes:
+        return (self.bodies / entry.body).read_bytes()
+
+
+@dataclass
+class Faults:
+    """注入的延迟（毫秒）和错误。"""
+
+    latency: float = 0.0
+    jitter: float = 0.0
+    error_rate: float = 0.0
+    error_status: int = 503
+    seed: int | None = None
+
+
+class ReplayServer:
+    """在后台线程的事件循环中回放录制的响应。
+
+    用法::
+
+        with ReplayServer(Cassette(path), Faults(latency=50, error_rate=0.05)) as server:
+            ...  # 以 server.url 作为 base_url 抓取
+    """
+
+    def __init__(
+        self,
+        cassette: Cassette,
+        faults: Faults | None = None,
+        host: str = "127.0.0.1",
+        port: int = 0,
+    ):
+        self.cassette = cassette
+        self.faults = faults or Faults()
+        self.host = host
+        self.port = port
+        self.entries = cassette.entries()
+        self.served = 0
+        self.injected = 0
+        self._random = random.Random(self.faults.seed)
+        self._bodies: dict[str, bytes] = {}
+        self._loop: asyncio.AbstractEventLoop | None = None
+        self._runner: web.AppRunner | None = None
+        self._thread: threading.Thread | None = None
+
+    @property
+    def url(self) -> str:
+        return f"http://{self.host}:{self.port}"
+
+    def _body(self, entry: Recorded) -> bytes:
+        if entry.body not in self._bodies:
+            self._bodies[entry.body] = self.cassette.content(entry)
+        return self._bodies[entry.body]
+
+    async def handle(self, request: web.Request) -> web.Response:
+        faults = self.faults
+        delay = faults.latency + self._random.uniform(0, faults.jitter)
+        if delay > 0:
+            await asyncio.sleep(delay / 1000)
+        if faults.error_rate and self._random.random() < faults.error_rate:
+            self.injected += 1
+            return web.Response(status=faults.error_status)
+        entry = self.entries.get(request.rel_url.raw_path_qs)
+        if entry is None:
+            return web.Response(status=404)
+        self.served += 1
+        return web.Response(
+            status=entry.status,
+            body=self._body(entry),
+            headers={"Content-Type": f"text/html; charset={entry.encoding}"},
+        )
+
+    async def _start(self) -> None:
+        app = web.Application()
+        app.router.add_route("GET", "/{tail:.*}", self.handle)
+        self._runner = web.AppRunner(app, access_log=None)
+        await self._runner.setup()
+        site = web.TCPSite(self._runner, self.host, self.port)
+        await site.start()
+        # port=0 时由系统分配端口
+        self.port = self._runner.addresses[0][1]
+
+    def start(self) -> ReplayServer:
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+        self._thread.start()
+        asyncio.run_coroutine_threadsafe(self._start(), self._loop).result()
+        return self
+
+    def stop(self) -> None:
+        if self._loop is None:
+            return
+        asyncio.run_coroutine_threadsafe(self._runner.cleanup(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+        self._loop = None
+
+    def __enter__(self) -> ReplayServer:
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
@@ -0,0 +1,49 @@
+"""车主之家（16888.com）销量排行抓取。"""
+
+from __future__ import annotations
+
+from collections.abc import AsyncIterator
+
+from .fetcher import AsyncFetcher
+from .metrics import REGISTRY
+from .parsing import DEFAULT_PARSER, Record, iter_table, record_type
+
+BASE_URL = "https://xl.16888.com"
+LIST_PATH = "/style-{page}.html"
+
+# 销量榜按月更新，缓存一天
+LIST_TTL = 24 * 3600
+
+FIELDS = ["厂商", "品牌", "车系", "车型", "销量", "排名", "时间"]
+
+BRAND_FIELD = "品牌"
+DATE_FIELD = "时间"
+
+SalesRow = record_type("SalesRow", FIELDS)
+
+
+def list_url(page: int, base_url: str = BASE_URL) -> str:
+    return base_url + LIST_PATH.format(page=page)
+
+
+def parse_list_page(html: str | bytes, parser: str = DEFAULT_PARSER) -> list[Record]:
+    return list(iter_table(html, FIELDS, SalesRow, parser=parser))
+
+
+async def crawl_pages(
+    fetcher: AsyncFetcher,
+    pages: int = 5,
+    base_url: str = BASE_URL,
+    parser: str = DEFAULT_PARSER,
+) -> AsyncIterator[tuple[int, list[Record] | None]]:
+    """并发抓取第 1..pages 页，按到达顺序产出 ``(页码, 行列表)``；抓取失败的页产出 ``(页码, None)``。"""
+    requests = ((list_url(page, base_url), page) for page in range(1, pages + 1))
+    async for result in fetcher.fetch_many(requests, ttl=LIST_TTL):
+        if not result.ok:
+            print(f"  第 {result.meta} 页抓取失败: {result.error or result.status}")
+            yield result.meta, None
+            continue
+        with REGISTRY.timer("parse_seconds", source="sales", parser=parser):
+            rows = parse_list_page(result.text, parser)
+        REGISTRY.inc("rows_parsed_total", len(rows), source="sales")
+        yield result.meta, rows
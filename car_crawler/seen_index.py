@@ -0,0 +1,121 @@
+"""投诉编号的持久化去重索引（SQLite）。
+
+按 品牌/车系/车型 组合（范围）分别记录已抓取投诉的编号和高水位
+（已见过的最大投诉编号）。增量抓取时一旦遇到该范围已见过的投诉即可停止翻页；
+不同范围互不影响，先抓品牌再抓其下车系时车系仍会抓取完整历史。
+
+范围在抓取开始时标记为未完成，正常结束后才清除；调用方有投诉暂缓写出时
+（如详情没拿到）也可重新标记。未完成的范围下次不在已见投诉处停止，
+而是跳过已见投诉继续翻页，补抓遗漏的投诉。
+"""
+
+from __future__ import annotations
+
+import sqlite3
+import time
+from collections.abc import Iterable
+from pathlib import Path
+
+from .output import OUT_DIR
+
+DEFAULT_PATH = OUT_DIR / "seen.sqlite3"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS complaints (
+    scope TEXT NOT NULL,
+    id TEXT NOT NULL,
+    first_seen REAL NOT NULL,
+    PRIMARY KEY (scope, id)
+);
+CREATE TABLE IF NOT EXISTS watermarks (
+    scope TEXT PRIMARY KEY,
+    high_id INTEGER NOT NULL,
+    updated_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS incomplete (
+    scope TEXT PRIMARY KEY,
+    started_at REAL NOT NULL
+);
+"""
+
+
+def scope_key(brand: int, series: int, model: int) -> str:
+    return f"{brand}-{series}-{model}"
+
+
+class SeenIndex:
+    """已见投诉编号与高水位的 SQLite 索引。"""
+
+    def __init__(self, path: str | Path = DEFAULT_PATH):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.conn = sqlite3.connect(self.path)
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self) -> SeenIndex:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def high_water(self, scope: str) -> int | None:
+        row = self.conn.execute(
+            "SELECT high_id FROM watermarks WHERE scope = ?", (scope,)
+        ).fetchone()
+        return row[0] if row else None
+
+    def complete(self, scope: str) -> bool:
+        """该范围上次抓取是否正常结束（从未抓取过也算）。"""
+        row = self.conn.execute("SELECT 1 FROM incomplete WHERE scope = ?", (scope,)).fetchone()
+        return row is None
+
+    def mark_incomplete(self, scope: str) -> None:
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO incomplete (scope, started_at) VALUES (?, ?)",
+                (scope, time.time()),
+            )
+
+    def mark_complete(self, scope: str) -> None:
+        with self.conn:
+            self.conn.execute("DELETE FROM incomplete WHERE scope = ?", (scope,))
+
+    def seen(self, scope: str, ids: Iterable[str]) -> set[str]:
+        """返回 ``ids`` 中已经记录在该范围下的编号。"""
+        ids = list(ids)
+        found: set[str] = set()
+        # SQLite 单条语句的参数个数有上限，分批查询
+        for i in range(0, len(ids), 500):
+            batch = ids[i : i + 500]
+            placeholders = ",".join("?" * len(batch))
+            found.update(
+                r[0]
+                for r in self.conn.execute(
+                    f"SELECT id FROM complaints WHERE scope = ? AND id IN ({placeholders})",
+                    [scope, *batch],
+                )
+            )
+        return found
+
+    def add(self, scope: str, ids: Iterable[str]) -> None:
+        """记录新编号并推进该范围的高水位（单个事务）。"""
+        ids = list(ids)
+        if not ids:
+            return
+        now = time.time()
+        numeric = [int(i) for i in ids if i.isdigit()]
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO complaints (scope, id, first_seen) VALUES (?, ?, ?)",
+                [(scope, i, now) for i in ids],
+            )
+            if numeric:
+                self.conn.execute(
+                    "INSERT INTO watermarks (scope, high_id, updated_at) VALUES (?, ?, ?) "
+                    "ON CONFLICT(scope) DO UPDATE SET "
+                    "high_id = MAX(high_id, excluded.high_id), updated_at = excluded.updated_at",
+                    (scope, max(numeric), now),
+                )
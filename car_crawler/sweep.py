@@ -0,0 +1,277 @@
+"""全量投诉抓取：多进程分片 + 断点续抓。
+
+先通过品牌/车系/车型接口（走响应缓存）展开工作列表，再把工作项分块
+交给进程池；每个工作进程在自己的事件循环里用 :class:`AsyncFetcher`
+并发抓取。主进程按投诉编号去重后追加写入同一个输出文件，并在每块完成后
+更新断点文件，中途崩溃时重新运行即可从断点继续。工作进程的抓取统计
+随每块结果交回主进程合并。
+"""
+
+from __future__ import annotations
+
+import asyncio
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from dataclasses import asdict, dataclass
+from pathlib import Path
+
+from . import zlts
+from .fetcher import AsyncFetcher
+from .metrics import REGISTRY
+from .output import OUT_DIR
+from .parsing import DEFAULT_PARSER, Record
+from .replay import Cassette
+from .writers import DEFAULT_CHUNK_ROWS, compact_parquet, iter_column, open_writer, target_path
+
+DEFAULT_CHECKPOINT = OUT_DIR / "sweep_checkpoint.json"
+LEVELS = ("brand", "series", "model")
+
+
+@dataclass(frozen=True)
+class WorkItem:
+    brand: int
+    series: int = 0
+    model: int = 0
+    label: str = ""
+
+    @property
+    def key(self) -> str:
+        return f"{self.brand}-{self.series}-{self.model}"
+
+
+@dataclass
+class FetchOptions:
+    """传给工作进程的抓取参数（需可 pickle）。"""
+
+    concurrency: int = 8
+    rate: float = 2.0
+    retries: int = 3
+    base_url: str = zlts.BASE_URL
+    parser: str = DEFAULT_PARSER
+    record: str | None = None
+
+
+async def _lookup(coro, label: str, failed: list[str]) -> list[tuple[int, str]]:
+    """查询一个品牌的车系（或车系的车型）；失败时报告并记入 ``failed``，返回空列表。"""
+    try:
+        return await coro
+    except (RuntimeError, ValueError) as exc:
+        # fetch_options 抓取失败抛 RuntimeError，响应体不是 JSON 时抛 JSONDecodeError
+        print(f"  {label}: 查询失败，本次跳过，下次运行时重试 ({exc})")
+        failed.append(label)
+        return []
+
+
+async def build_work_list(
+    fetcher: AsyncFetcher,
+    level: str = "series",
+    brands: list[int] | None = None,
+    base_url: str = zlts.BASE_URL,
+) -> tuple[list[WorkItem], list[str]]:
+    """按 ``level`` 把品牌展开为 品牌 / 车系 / 车型 粒度的工作项。
+
+    返回 ``(工作项, 查询失败的品牌/车系)``。单个品牌或车系查询失败不影响其他项，
+    它下面的工作项不会出现在列表里，调用方应保留断点，重新运行时再次查询。
+    """
+    brand_options = await zlts.fetch_brands(fetcher, base_url)
+    if brands:
+        brand_options = [(b, name) for b, name in brand_options if b in brands]
+    items = [WorkItem(b, label=name) for b, name in brand_options]
+    failed: list[str] = []
+    if level == "brand":
+        return items, failed
+
+    series_lists = await asyncio.gather(
+        *(
+            _lookup(
+                zlts.fetch_series(fetcher, item.brand, base_url), item.label or item.key, failed
+            )
+            for item in items
+        )
+    )
+    items = [
+        WorkItem(item.brand, s, label=f"{item.label}/{name}")
+        for item, series in zip(items, series_lists)
+        for s, name in series
+    ]
+    if level == "series":
+        return items, failed
+
+    model_lists = await asyncio.gather(
+        *(
+            _lookup(
+                zlts.fetch_models(fetcher, item.brand, item.series, base_url),
+                item.label or item.key,
+                failed,
+            )
+            for item in items
+        )
+    )
+    items = [
+        WorkItem(item.brand, item.series, m, label=f"{item.label}/{name}")
+        for item, models in zip(items, model_lists)
+        for m, name in models
+    ]
+    return items, failed
+
+
+async def _crawl_chunk_async(
+    items: list[WorkItem], pages: int, options: FetchOptions
+) -> list[tuple[WorkItem, list[Record], bool]]:
+    async with AsyncFetcher(
+        concurrency=options.concurrency,
+        rate=options.rate,
+        retries=options.retries,
+        recorder=Cassette(options.record) if options.record else None,
+    ) as fetcher:
+
+        async def crawl(item: WorkItem) -> tuple[WorkItem, list[Record], bool]:
+            by_page = {}
+            async for page, rows in zlts.crawl_pages(
+                fetcher,
+                item.brand,
+                item.series,
+                item.model,
+                pages,
+                options.base_url,
+                parser=options.parser,
+            ):
+                by_page[page] = rows
+            complete = all(rows is not None for rows in by_page.values())
+            rows = [row for page in sorted(by_page) for row in by_page[page] or ()]
+            return item, rows, complete
+
+        return await asyncio.gather(*(crawl(item) for item in items))
+
+
+def crawl_chunk(
+    items: list[WorkItem], pages: int, options: FetchOptions
+) -> tuple[list[tuple[WorkItem, list[Record], bool]], dict]:
+    """工作进程入口：抓取一块工作项。
+
+    返回 ``[(工作项, 行, 是否全部页成功)]`` 和本块的统计快照；工作进程会被复用，
+    所以每块开始前清空统计。
+    """
+    REGISTRY.reset()
+    results = asyncio.run(_crawl_chunk_async(items, pages, options))
+    return results, REGISTRY.snapshot()
+
+
+class Checkpoint:
+    """断点文件：记录输出位置与格式、参数和已完成的工作项。"""
+
+    def __init__(
+        self,
+        path: str | Path,
+        output: Path,
+        pages: int,
+        level: str,
+        fmt: str = "csv",
+        partition_by: list[str] | None = None,
+    ):
+        self.path = Path(path)
+        self.output = output
+        self.pages = pages
+        self.level = level
+        self.fmt = fmt
+        self.partition_by = partition_by or []
+        self.done: set[str] = set()
+
+    @property
+    def target(self) -> Path:
+        return target_path(self.output, self.fmt, self.partition_by)
+
+    @classmethod
+    def load(cls, path: str | Path) -> Checkpoint | None:
+        path = Path(path)
+        if not path.exists():
+            return None
+        data = json.loads(path.read_text(encoding="utf-8"))
+        checkpoint = cls(
+            path,
+            Path(data["output"]),
+            data["pages"],
+            data["level"],
+            data.get("format", "csv"),
+            data.get("partition_by"),
+        )
+        checkpoint.done = set(data["done"])
+        return checkpoint
+
+    def save(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        data = {
+            "output": str(self.output),
+            "pages": self.pages,
+            "level": self.level,
+            "format": self.fmt,
+            "partition_by": self.partition_by,
+            "done": sorted(self.done),
+        }
+        tmp = self.path.with_suffix(".tmp")
+        tmp.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+        os.replace(tmp, self.path)
+
+
+def run_sweep(
+    items: list[WorkItem],
+    checkpoint: Checkpoint,
+    options: FetchOptions,
+    workers: int | None = None,
+    chunk_size: int = 8,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> int:
+    """用进程池抓取所有未完成的工作项，返回新写出的行数。"""
+    workers = workers or os.cpu_count() or 1
+    todo = [item for item in items if item.key not in checkpoint.done]
+    chunks = [todo[i : i + chunk_size] for i in range(0, len(todo), chunk_size)]
+    # 续抓时从已写出的数据恢复去重集合
+    seen = set(iter_column(checkpoint.target, "投诉编号"))
+    # 按主机的限速是全局预算，平均分给各工作进程
+    worker_options = FetchOptions(**{**asdict(options), "rate": options.rate / workers})
+    print(
+        f"共 {len(items)} 项，已完成 {len(items) - len(todo)} 项，"
+        f"剩余 {len(chunks)} 块，{workers} 个进程"
+    )
+
+    written = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = [
+            pool.submit(crawl_chunk, chunk, checkpoint.pages, worker_options) for chunk in chunks
+        ]
+        for n, future in enumerate(as_completed(futures), 1):
+            new_rows = []
+            results, snapshot = future.result()
+            REGISTRY.merge(snapshot)
+            for item, rows, complete in results:
+                for row in rows:
+                    if row["投诉编号"] not in seen:
+                        seen.add(row["投诉编号"])
+                        new_rows.append(row)
+                if complete:
+                    checkpoint.done.add(item.key)
+                else:
+                    print(f"  {item.label or item.key}: 有页面抓取失败，下次运行时重试")
+            # 每块单独打开写入器并关闭，确保断点记录的数据已完整落盘
+            with REGISTRY.timer("write_seconds", format=checkpoint.fmt), open_writer(
+                checkpoint.output,
+                checkpoint.fmt,
+                zlts.FIELDS,
+                zlts.BRAND_FIELD,
+                zlts.DATE_FIELD,
+                checkpoint.partition_by,
+                append=True,
+                chunk_rows=chunk_rows,
+            ) as writer:
+                writer.write(new_rows)
+            checkpoint.save()
+            written += len(new_rows)
+            print(f"  [{n}/{len(chunks)}] 新增 {len(new_rows)} 条，累计 {len(seen)} 条")
+    if checkpoint.fmt == "parquet":
+        # 每块各写一个分片才能保证断点可靠，结束后合并，避免大量小文件
+        with REGISTRY.timer("write_seconds", format=checkpoint.fmt):
+            removed = compact_parquet(checkpoint.target)
+        if removed:
+            print(f"已合并 Parquet 分片，删除 {removed} 个小文件")
+    return written
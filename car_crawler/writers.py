@@ -0,0 +1,383 @@
+"""分块流式写出：CSV / JSON Lines / Parquet，可按品牌和月份分区。
+
+写入器只缓冲 ``chunk_rows`` 行，满了就写出一块，内存占用与总页数无关。
+JSON Lines 和 Parquet 输出带类型：日期列（投诉时间、发布时间、时间）
+转为日期，销量、排名转为整数，无法解析的值为空；CSV 保持原始文本。
+
+- 不分区时 CSV / JSON Lines 写单个文件，Parquet 写一个目录，
+  每次运行新增一个 ``part-*.parquet``（每块一个 row group）；
+- 分区时写一个目录，按 ``brand=<品牌>/month=<YYYY-MM>/`` 的 Hive 风格
+  分子目录，可以直接用 ``pandas.read_parquet(目录)`` 读取。同时打开的分区
+  写入器不超过 ``max_open`` 个，最久未用的先关闭，再次用到时追加写。
+
+多次追加产生的小 ``part-*.parquet`` 可用 :func:`compact_parquet` 合并。
+"""
+
+from __future__ import annotations
+
+import csv
+import json
+import os
+import re
+import shutil
+import time
+from collections import OrderedDict
+from collections.abc import Iterable, Iterator, Mapping
+from datetime import date
+from pathlib import Path
+
+from .output import safe_name
+
+FORMATS = ("csv", "jsonl", "parquet")
+PARTITIONS = ("brand", "date")
+DEFAULT_CHUNK_ROWS = 1000
+DEFAULT_MAX_OPEN = 64
+COMPACT_ROW_GROUP_ROWS = 100_000
+
+DATE_COLUMNS = frozenset({"投诉时间", "发布时间", "时间"})
+INT_COLUMNS = frozenset({"销量", "排名"})
+
+_DATE = re.compile(r"(\d{4})[-/.年](\d{1,2})(?:[-/.月](\d{1,2}))?")
+_NON_DIGIT = re.compile(r"[^\d-]")
+
+
+def to_date(value: str) -> date | None:
+    """解析 ``2025-01-29``、``2025/1/29``、``2025年1月``、``2025-09`` 等，只有年月时取当月 1 日。"""
+    match = _DATE.search(value or "")
+    if match is None:
+        return None
+    year, month, day = match.groups()
+    try:
+        return date(int(year), int(month), int(day or 1))
+    except ValueError:
+        return None
+
+
+def to_int(value: str) -> int | None:
+    """解析 ``12,345``、``1234辆`` 等整数。"""
+    digits = _NON_DIGIT.sub("", value or "")
+    try:
+        return int(digits)
+    except ValueError:
+        return None
+
+
+def typed_row(row: Mapping[str, str], fields: list[str]) -> dict:
+    typed = {}
+    for field in fields:
+        value = row.get(field, "")
+        if field in DATE_COLUMNS:
+            typed[field] = to_date(value)
+        elif field in INT_COLUMNS:
+            typed[field] = to_int(value)
+        else:
+            typed[field] = value
+    return typed
+
+
+class ChunkedWriter:
+    """分块写出的基类：``write`` 只缓冲，攒够 ``chunk_rows`` 行再写一块。"""
+
+    suffix = ""
+
+    def __init__(self, path: Path, fields: list[str], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        self.path = path
+        self.fields = fields
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._buffer: list[Mapping[str, str]] = []
+
+    def __enter__(self) -> ChunkedWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def write(self, rows: Iterable[Mapping[str, str]]) -> None:
+        for row in rows:
+            self._buffer.append(row)
+            if len(self._buffer) >= self.chunk_rows:
+                self.flush()
+
+    def flush(self) -> None:
+        if self._buffer:
+            self._write_chunk(self._buffer)
+            self.rows += len(self._buffer)
+            self._buffer = []
+
+    def close(self) -> None:
+        self.flush()
+        self._close()
+
+    def _write_chunk(self, rows: list[Mapping[str, str]]) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        pass
+
+
+class CsvWriter(ChunkedWriter):
+    """追加写 CSV（文件不存在时先写表头），保持原始文本。"""
+
+    suffix = ".csv"
+
+    def __init__(self, path: Path, fields: list[str], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        super().__init__(path, fields, chunk_rows)
+        self._file = None
+        self._writer = None
+
+    def _write_chunk(self, rows: list[Mapping[str, str]]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            exists = self.path.exists() and self.path.stat().st_size > 0
+            encoding = "utf-8" if exists else "utf-8-sig"
+            self._file = open(self.path, "a", newline="", encoding=encoding)
+            self._writer = csv.DictWriter(self._file, fieldnames=self.fields, extrasaction="ignore")
+            if not exists:
+                self._writer.writeheader()
+        self._writer.writerows(rows)
+        self._file.flush()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class JsonlWriter(ChunkedWriter):
+    """追加写 JSON Lines，日期写为 ISO 格式字符串，整数列写为数字。"""
+
+    suffix = ".jsonl"
+
+    def __init__(self, path: Path, fields: list[str], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        super().__init__(path, fields, chunk_rows)
+        self._file = None
+
+    def _write_chunk(self, rows: list[Mapping[str, str]]) -> None:
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.writelines(
+            json.dumps(typed_row(row, self.fields), ensure_ascii=False, default=date.isoformat)
+            + "\n"
+            for row in rows
+        )
+        self._file.flush()
+
+    def _close(self) -> None:
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+
+class ParquetWriter(ChunkedWriter):
+    """在 ``path`` 目录下写一个新的 ``part-*.parquet``，每块一个 row group。
+
+    需要安装 pyarrow（``uv sync --extra parquet``）。
+    """
+
+    def __init__(self, path: Path, fields: list[str], chunk_rows: int = DEFAULT_CHUNK_ROWS):
+        super().__init__(path, fields, chunk_rows)
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as e:
+            raise RuntimeError("写 Parquet 需要安装 pyarrow：uv sync --extra parquet") from e
+        self._pa, self._pq = pa, pq
+        self.schema = pa.schema(
+            [
+                (
+                    field,
+                    pa.date32()
+                    if field in DATE_COLUMNS
+                    else pa.int64()
+                    if field in INT_COLUMNS
+                    else pa.string(),
+                )
+                for field in fields
+            ]
+        )
+        self._writer = None
+
+    def _write_chunk(self, rows: list[Mapping[str, str]]) -> None:
+        if self._writer is None:
+            self.path.mkdir(parents=True, exist_ok=True)
+            part = self.path / f"part-{time.time_ns()}.parquet"
+            self._writer = self._pq.ParquetWriter(part, self.schema)
+        typed = [typed_row(row, self.fields) for row in rows]
+        columns = {field: [row[field] for row in typed] for field in self.fields}
+        self._writer.write_table(self._pa.Table.from_pydict(columns, schema=self.schema))
+
+    def _close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+
+
+WRITERS: dict[str, type[ChunkedWriter]] = {
+    "csv": CsvWriter,
+    "jsonl": JsonlWriter,
+    "parquet": ParquetWriter,
+}
+
+
+class PartitionedWriter(ChunkedWriter):
+    """按品牌和/或月份把行分发给各分区目录下的写入器。
+
+    最多同时打开 ``max_open`` 个分区写入器，超出时关闭最久未用的，
+    避免分区很多时耗尽文件描述符。
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        fmt: str,
+        fields: list[str],
+        brand_field: str,
+        date_field: str,
+        partition_by: Iterable[str] = PARTITIONS,
+        chunk_rows: int = DEFAULT_CHUNK_ROWS,
+        max_open: int = DEFAULT_MAX_OPEN,
+    ):
+        super().__init__(path, fields, chunk_rows)
+        self.fmt = fmt
+        self.brand_field = brand_field
+        self.date_field = date_field
+        self.partition_by = [p for p in PARTITIONS if p in partition_by]
+        self.max_open = max(1, max_open)
+        self._writers: OrderedDict[tuple[str, ...], ChunkedWriter] = OrderedDict()
+
+    def _partition(self, row: Mapping[str, str]) -> tuple[str, ...]:
+        parts = []
+        if "brand" in self.partition_by:
+            parts.append(f"brand={safe_name(row.get(self.brand_field, '')) or '未知'}")
+        if "date" in self.partition_by:
+            day = to_date(row.get(self.date_field, ""))
+            parts.append(f"month={day:%Y-%m}" if day else "month=未知")
+        return tuple(parts)
+
+    def _write_chunk(self, rows: list[Mapping[str, str]]) -> None:
+        groups: dict[tuple[str, ...], list[Mapping[str, str]]] = {}
+        for row in rows:
+            groups.setdefault(self._partition(row), []).append(row)
+        for key, group in groups.items():
+            writer = self._writer(key)
+            writer.write(group)
+            writer.flush()
+
+    def _writer(self, key: tuple[str, ...]) -> ChunkedWriter:
+        writer = self._writers.get(key)
+        if writer is not None:
+            self._writers.move_to_end(key)
+            return writer
+        if len(self._writers) >= self.max_open:
+            _, idle = self._writers.popitem(last=False)
+            idle.close()
+        cls = WRITERS[self.fmt]
+        target = self.path.joinpath(*key)
+        if cls.suffix:
+            target = target / f"part{cls.suffix}"
+        writer = self._writers[key] = cls(target, self.fields, self.chunk_rows)
+        return writer
+
+    def _close(self) -> None:
+        for writer in self._writers.values():
+            writer.close()
+        self._writers.clear()
+
+
+def target_path(stem: Path, fmt: str, partition_by: Iterable[str] = ()) -> Path:
+    """输出位置：不分区的 CSV / JSON Lines 是单个文件，其余是目录。"""
+    if partition_by or not WRITERS[fmt].suffix:
+        return stem
+    return stem.with_name(stem.name + WRITERS[fmt].suffix)
+
+
+def remove_output(stem: Path, fmt: str, partition_by: Iterable[str] = ()) -> None:
+    """删除同名的旧输出（文件或目录）。"""
+    path = target_path(stem, fmt, partition_by)
+    if path.is_dir():
+        shutil.rmtree(path)
+    elif path.exists():
+        path.unlink()
+
+
+def open_writer(
+    stem: Path,
+    fmt: str,
+    fields: list[str],
+    brand_field: str = "",
+    date_field: str = "",
+    partition_by: Iterable[str] = (),
+    append: bool = False,
+    chunk_rows: int = DEFAULT_CHUNK_ROWS,
+) -> ChunkedWriter:
+    """按格式和分区方式创建写入器。
+
+    ``append=False`` 时先删除同名的旧输出（与原来覆盖当天 CSV 的行为一致）。
+    """
+    partition_by = list(partition_by)
+    path = target_path(stem, fmt, partition_by)
+    if not append:
+        remove_output(stem, fmt, partition_by)
+    if partition_by:
+        return PartitionedWriter(
+            path, fmt, fields, brand_field, date_field, partition_by, chunk_rows
+        )
+    return WRITERS[fmt](path, fields, chunk_rows)
+
+
+def compact_parquet(path: Path, row_group_rows: int = COMPACT_ROW_GROUP_ROWS) -> int:
+    """把 ``path`` 下每个目录中的多个 ``part-*.parquet`` 流式合并为一个，返回删除的文件数。
+
+    合并结果先写临时文件，再替换该目录最后一个分片并删除其余分片；
+    替换后、删除完成前中断会留下重复行，续抓时按编号去重不受影响。
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    removed = 0
+    for directory in sorted({part.parent for part in path.rglob("part-*.parquet")}):
+        parts = sorted(directory.glob("part-*.parquet"))
+        if len(parts) < 2:
+            continue
+        tmp = directory / f"compact-{time.time_ns()}.tmp"
+        writer, batches, buffered = None, [], 0
+        for part in parts:
+            with pq.ParquetFile(part) as f:
+                if writer is None:
+                    writer = pq.ParquetWriter(tmp, f.schema_arrow)
+                for batch in f.iter_batches(batch_size=row_group_rows):
+                    batches.append(batch)
+                    buffered += batch.num_rows
+                    if buffered >= row_group_rows:
+                        writer.write_table(pa.Table.from_batches(batches))
+                        batches, buffered = [], 0
+        if batches:
+            writer.write_table(pa.Table.from_batches(batches))
+        writer.close()
+        os.replace(tmp, parts[-1])
+        for part in parts[:-1]:
+            part.unlink()
+        removed += len(parts) - 1
+    return removed
+
+
+def iter_column(path: Path, field: str) -> Iterator[str]:
+    """读出已写出数据中某一列的原始值（文件或目录，任意格式），用于续抓去重。"""
+    if not path.exists():
+        return
+    files = [path] if path.is_file() else sorted(p for p in path.rglob("*") if p.is_file())
+    for file in files:
+        if file.suffix == ".csv":
+            with open(file, newline="", encoding="utf-8-sig") as f:
+                for row in csv.DictReader(f):
+                    yield row[field]
+        elif file.suffix == ".jsonl":
+            with open(file, encoding="utf-8") as f:
+                for line in f:
+                    yield str(json.loads(line)[field])
+        elif file.suffix == ".parquet":
+            import pyarrow.parquet as pq
+
+            yield from (str(v) for v in pq.read_table(file, columns=[field]).column(0).to_pylist())
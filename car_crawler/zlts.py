@@ -0,0 +1,232 @@
+"""车质网（12365auto.com）投诉数据抓取。
+
+列表页 URL 由品牌/车系/车型 ID 和页码拼出；品牌、车系、车型的 ID 与名称
+通过站点的 JSON 接口查询。页面抓取交给 :class:`~car_crawler.fetcher.AsyncFetcher`，
+每页到达后立即解析。
+"""
+
+from __future__ import annotations
+
+import json
+from collections.abc import AsyncIterator, Iterator
+from urllib.parse import urljoin
+
+from lxml import etree
+
+from .fetcher import AsyncFetcher
+from .metrics import REGISTRY
+from .parsing import DEFAULT_PARSER, Record, make_soup, parse_html, record_type, text_of
+from .seen_index import SeenIndex, scope_key
+
+BASE_URL = "https://www.12365auto.com"
+LIST_PATH = "/zlts/{brand}-{series}-{model}-0-0-0_0-0-0-0-0-0-0-{page}.shtml"
+BRANDS_PATH = "/server/forCar/getBrand.ashx"
+SERIES_PATH = "/server/forCar/getSeries.ashx?bid={brand}"
+MODELS_PATH = "/server/forCar/getModel.ashx?bid={brand}&sid={series}"
+
+# 品牌/车系/车型列表很少变化，缓存一周
+LOOKUP_TTL = 7 * 24 * 3600
+
+FIELDS = [
+    "投诉编号",
+    "投诉品牌",
+    "投诉车系",
+    "投诉车型",
+    "问题简述",
+    "典型问题",
+    "投诉时间",
+    "投诉状态",
+    "详情链接",
+]
+
+# 分区写出时使用的品牌列和日期列
+BRAND_FIELD = "投诉品牌"
+DATE_FIELD = "投诉时间"
+
+Complaint = record_type("Complaint", FIELDS)
+
+_TABLE = etree.XPath(
+    "(//div[contains(concat(' ', normalize-space(@class), ' '), ' tslb_b ')]//table)[1]"
+)
+_ROWS = etree.XPath(".//tr")
+_CELLS = etree.XPath(".//td")
+_FIRST_LINK = etree.XPath("(.//a)[1]")
+
+
+def list_url(brand: int, series: int, model: int, page: int, base_url: str = BASE_URL) -> str:
+    return base_url + LIST_PATH.format(brand=brand, series=series, model=model, page=page)
+
+
+def _iter_lxml(html: str | bytes, base_url: str) -> Iterator[Complaint]:
+    root = parse_html(html)
+    tables = _TABLE(root) if root is not None else []
+    if not tables:
+        return
+    for tr in _ROWS(tables[0]):
+        tds = _CELLS(tr)
+        if len(tds) < 8:
+            continue
+        links = _FIRST_LINK(tds[4])
+        href = links[0].get("href") if links else None
+        yield Complaint(*(text_of(td) for td in tds[:8]), urljoin(base_url, href) if href else "")
+
+
+def _iter_bs4(html: str | bytes, base_url: str) -> Iterator[Complaint]:
+    soup = make_soup(html)
+    table = soup.select_one("div.tslb_b table")
+    if table is None:
+        return
+    for tr in table.find_all("tr"):
+        tds = tr.find_all("td")
+        if len(tds) < 8:
+            continue
+        values = [td.get_text(strip=True) for td in tds[:8]]
+        link = tds[4].find("a")
+        href = urljoin(base_url, link["href"]) if link and link.get("href") else ""
+        yield Complaint(*values, href)
+
+
+def iter_list_page(
+    html: str | bytes, base_url: str = BASE_URL, parser: str = DEFAULT_PARSER
+) -> Iterator[Complaint]:
+    """逐行解析投诉列表页。"""
+    return (_iter_lxml if parser == "lxml" else _iter_bs4)(html, base_url)
+
+
+def parse_list_page(
+    html: str | bytes, base_url: str = BASE_URL, parser: str = DEFAULT_PARSER
+) -> list[Record]:
+    """解析投诉列表页，返回按页面顺序排列的行。"""
+    return list(iter_list_page(html, base_url, parser))
+
+
+def parse_options(payload: str | bytes) -> list[tuple[int, str]]:
+    """解析品牌/车系/车型接口返回的 JSON，得到 ``(id, 名称)`` 列表。"""
+    items = json.loads(payload)
+    if isinstance(items, dict):
+        items = items.get("data") or items.get("list") or []
+    options = []
+    for item in items:
+        item_id = item.get("id", item.get("Id"))
+        name = item.get("name", item.get("Name"))
+        if item_id is not None and name:
+            options.append((int(item_id), str(name).strip()))
+    return options
+
+
+async def fetch_options(fetcher: AsyncFetcher, url: str) -> list[tuple[int, str]]:
+    result = await fetcher.fetch(url, ttl=LOOKUP_TTL)
+    if not result.ok:
+        raise RuntimeError(f"查询失败: {url} ({result.error or result.status})")
+    return parse_options(result.content)
+
+
+async def fetch_brands(fetcher: AsyncFetcher, base_url: str = BASE_URL) -> list[tuple[int, str]]:
+    return await fetch_options(fetcher, base_url + BRANDS_PATH)
+
+
+async def fetch_series(
+    fetcher: AsyncFetcher, brand: int, base_url: str = BASE_URL
+) -> list[tuple[int, str]]:
+    return await fetch_options(fetcher, base_url + SERIES_PATH.format(brand=brand))
+
+
+async def fetch_models(
+    fetcher: AsyncFetcher, brand: int, series: int, base_url: str = BASE_URL
+) -> list[tuple[int, str]]:
+    return await fetch_options(
+        fetcher, base_url + MODELS_PATH.format(brand=brand, series=series)
+    )
+
+
+async def crawl_pages(
+    fetcher: AsyncFetcher,
+    brand: int = 0,
+    series: int = 0,
+    model: int = 0,
+    pages: int = 5,
+    base_url: str = BASE_URL,
+    first_page: int = 1,
+    parser: str = DEFAULT_PARSER,
+) -> AsyncIterator[tuple[int, list[Record] | None]]:
+    """并发抓取第 first_page..pages 页，按到达顺序产出 ``(页码, 行列表)``；抓取失败的页产出 ``(页码, None)``。"""
+    requests = (
+        (list_url(brand, series, model, page, base_url), page)
+        for page in range(first_page, pages + 1)
+    )
+    async for result in fetcher.fetch_many(requests):
+        if not result.ok:
+            print(f"  第 {result.meta} 页抓取失败: {result.error or result.status}")
+            yield result.meta, None
+            continue
+        with REGISTRY.timer("parse_seconds", source="zlts", parser=parser):
+            rows = parse_list_page(result.text, base_url, parser)
+        REGISTRY.inc("rows_parsed_total", len(rows), source="zlts")
+        yield result.meta, rows
+
+
+def _reached_high_water(rows: list[Record], high_water: int | None) -> bool:
+    """页中是否有编号不大于高水位的投诉（说明已翻到上次抓过的位置）。"""
+    if high_water is None:
+        return False
+    return any(
+        row["投诉编号"].isdigit() and int(row["投诉编号"]) <= high_water for row in rows
+    )
+
+
+async def crawl_new(
+    fetcher: AsyncFetcher,
+    index: SeenIndex,
+    brand: int = 0,
+    series: int = 0,
+    model: int = 0,
+    pages: int = 5,
+    base_url: str = BASE_URL,
+    parser: str = DEFAULT_PARSER,
+) -> AsyncIterator[tuple[int, list[Record]]]:
+    """增量抓取：只产出索引中没有的投诉，遇到已见过的投诉即停止翻页。
+
+    列表按时间倒序排列，所以按页码顺序检查。第 1 页单独抓取，整页都是
+    新投诉时才继续，之后每批页数翻倍，最多 ``fetcher.concurrency`` 页；
+    批内按页码顺序处理，某页出现已见投诉（或编号不超过高水位）后不再请求
+    后续页。是否产出某条投诉只看索引中的已见编号，高水位只用来决定何时停止。
+    调用方写出数据后再调用 ``index.add`` 记录编号，避免中途失败导致数据丢失。
+
+    某页抓取失败时立即停止，缺页之后的页既不产出也不记录，该范围保持
+    未完成标记；下次运行跳过已见投诉继续翻页（不在已见投诉处停止），
+    直到补齐缺页后正常结束。
+    """
+    scope = scope_key(brand, series, model)
+    # 上次中途失败：高水位之下可能还有没抓到的页
+    resuming = not index.complete(scope)
+    high_water = None if resuming else index.high_water(scope)
+    index.mark_incomplete(scope)
+    start, batch_size = 1, 1
+    while start <= pages:
+        end = min(start + batch_size - 1, pages)
+        batch = {}
+        async for page, rows in crawl_pages(
+            fetcher, brand, series, model, end, base_url, first_page=start, parser=parser
+        ):
+            batch[page] = rows
+        for page in range(start, end + 1):
+            rows = batch.get(page)
+            if rows is None:
+                # 缺页（抓取失败）：停止，保持未完成标记，下次运行补齐
+                return
+            if not rows:
+                # 空页说明已到末页
+                index.mark_complete(scope)
+                return
+            seen = index.seen(scope, (row["投诉编号"] for row in rows))
+            new_rows = [row for row in rows if row["投诉编号"] not in seen]
+            if new_rows:
+                yield page, new_rows
+            if not resuming and (
+                len(new_rows) < len(rows) or _reached_high_water(rows, high_water)
+            ):
+                index.mark_complete(scope)
+                return
+        start = end + 1
+        batch_size = min(batch_size * 2, fetcher.concurrency)
+    index.mark_complete(scope)
@@ -1,5 +1,4 @@
-def main():
-    print("Hello from car-crawler!")
+from car_crawler.cli import main
 
 
 if __name__ == "__main__":
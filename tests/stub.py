@@ -0,0 +1,51 @@
+"""测试用的本地 HTTP 桩服务器。"""
+
+from __future__ import annotations
+
+import asyncio
+import threading
+from collections.abc import AsyncIterator, Awaitable, Callable, Iterator
+from contextlib import asynccontextmanager, contextmanager
+
+from aiohttp import web
+
+Handler = Callable[[web.Request], Awaitable[web.StreamResponse]]
+
+
+@asynccontextmanager
+async def stub_server(handler: Handler) -> AsyncIterator[str]:
+    """在随机端口上启动服务器，所有 GET 请求交给 ``handler``，产出基础 URL。"""
+    app = web.Application()
+    app.router.add_route("GET", "/{tail:.*}", handler)
+    runner = web.AppRunner(app, access_log=None)
+    await runner.setup()
+    site = web.TCPSite(runner, "127.0.0.1", 0)
+    await site.start()
+    try:
+        yield f"http://127.0.0.1:{runner.addresses[0][1]}"
+    finally:
+        await runner.cleanup()
+
+
+@contextmanager
+def threaded_stub_server(handler: Handler) -> Iterator[str]:
+    """在后台线程的事件循环里运行 :func:`stub_server`，供同步代码（如进程池）访问。"""
+    started = threading.Event()
+    state: dict = {}
+
+    async def serve() -> None:
+        stop = asyncio.Event()
+        state["loop"], state["stop"] = asyncio.get_running_loop(), stop
+        async with stub_server(handler) as base:
+            state["base"] = base
+            started.set()
+            await stop.wait()
+
+    thread = threading.Thread(target=asyncio.run, args=(serve(),), daemon=True)
+    thread.start()
+    started.wait(5)
+    try:
+        yield state["base"]
+    finally:
+        state["loop"].call_soon_threadsafe(state["stop"].set)
+        thread.join(5)
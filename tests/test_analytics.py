@@ -0,0 +1,101 @@
+import csv
+import sqlite3
+
+import pytest
+
+pd = pytest.importorskip("pandas")
+
+from car_crawler import recall, sales, zlts  # noqa: E402
+from car_crawler.analytics import AliasIndex, Analytics, discover  # noqa: E402
+
+
+def test_series_in_titles_matches_within_brand():
+    aliases = AliasIndex(
+        sqlite3.connect(":memory:"),
+        {
+            "series": {
+                "比亚迪": {"汉": [], "唐": [], "宋PLUS": [], "宋": []},
+                "丰田": {"汉兰达": [], "部分": []},
+            }
+        },
+    )
+    brands = pd.Series(["比亚迪", "比亚迪", "比亚迪", "丰田", "比亚迪", "大众"])
+    titles = pd.Series(
+        [
+            "比亚迪汽车召回部分汉EV",
+            "召回部分唐DM-i及宋PLUS",
+            "召回部分宋 Pro",
+            "一汽丰田召回部分汉兰达",
+            "召回部分海豹",
+            "召回部分汉兰达",
+        ]
+    )
+    assert aliases.series_in_titles(brands, titles).tolist() == [
+        "汉",
+        "宋PLUS",
+        "宋",
+        "汉兰达",
+        "",
+        "",
+    ]
+
+
+def write_csv(path, fields, rows):
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f)
+        writer.writerow(fields)
+        writer.writerows(rows)
+
+
+def test_incremental_refresh_matches_rebuild_when_series_arrive_after_recalls(tmp_path):
+    out = tmp_path / "out"
+    out.mkdir()
+    write_csv(
+        out / "召回新闻_20250301.csv",
+        recall.FIELDS,
+        [["小鹏汽车召回部分小鹏P7汽车", "2025-02-10", "小鹏汽车", "制动系统", "/r/1"]],
+    )
+    with Analytics(tmp_path / "incremental.sqlite3") as engine:
+        engine.refresh(out)
+        assert engine.monthly()[["brand", "series", "recalls"]].values.tolist() == [
+            ["小鹏", "", 1]
+        ]
+
+        write_csv(
+            out / "销量排行_20250301.csv",
+            sales.FIELDS,
+            [["小鹏汽车", "小鹏", "小鹏P7", "", "1200", "1", "2025-02"]],
+        )
+        write_csv(
+            out / "投诉_小鹏汽车_20250301.csv",
+            zlts.FIELDS,
+            [["1", "小鹏汽车", "小鹏P7", "2024款", "异响", "", "2025-02-03", "", ""]],
+        )
+        stats = engine.refresh(out)
+        assert ("recalls", "2025-02") in stats.partitions
+        incremental = engine.monthly()
+
+    with Analytics(tmp_path / "rebuild.sqlite3") as engine:
+        engine.refresh(out, rebuild=True)
+        rebuilt = engine.monthly()
+
+    pd.testing.assert_frame_equal(incremental, rebuilt)
+    assert incremental[["brand", "series", "sales", "complaints", "recalls"]].values.tolist() == [
+        ["小鹏", "小鹏P7", 1200, 1, 1]
+    ]
+
+
+def test_discover_includes_unsuffixed_incremental_output(tmp_path):
+    for name in ("投诉.csv", "投诉_小鹏汽车_20250301.csv", "投诉统计.csv", "分析_月度.csv"):
+        (tmp_path / name).write_text("", encoding="utf-8")
+    (tmp_path / "投诉" / "brand=小鹏").mkdir(parents=True)
+    (tmp_path / "投诉" / "brand=小鹏" / "part.csv").write_text("", encoding="utf-8")
+    (tmp_path / "召回新闻.jsonl").write_text("", encoding="utf-8")
+
+    found = discover(tmp_path)
+    assert {path.relative_to(tmp_path).as_posix(): source for path, source in found.items()} == {
+        "投诉.csv": "complaints",
+        "投诉_小鹏汽车_20250301.csv": "complaints",
+        "投诉/brand=小鹏/part.csv": "complaints",
+        "召回新闻.jsonl": "recalls",
+    }
@@ -0,0 +1,29 @@
+import pytest
+
+from car_crawler import bench, recall, sales, zlts
+from car_crawler.replay import request_key
+
+
+def test_crawl_jobs_group_recorded_pages_by_crawl_pages_arguments():
+    keys = [request_key(zlts.list_url(525, 2820, 0, page)) for page in (2, 3, 5)]
+    keys += [request_key(zlts.list_url(0, 0, 0, 1)), "/zlts/other.shtml"]
+    assert bench.crawl_jobs("zlts", keys) == [
+        ({"brand": 0, "series": 0, "model": 0, "pages": 1, "first_page": 1}, [keys[3]]),
+        # 第 4 页没有录到，只抓连续的 2..3 页
+        ({"brand": 525, "series": 2820, "model": 0, "pages": 3, "first_page": 2}, keys[:2]),
+    ]
+
+    keys = [request_key(sales.list_url(page)) for page in (1, 2, 4)]
+    assert bench.crawl_jobs("sales", keys) == [({"pages": 2}, keys[:2])]
+
+    keys = [request_key(recall.list_url(page, keyword="小鹏")) for page in (1, 2)]
+    kwargs = {"keyword": "小鹏", "page_size": 20, "start_date": "", "end_date": "", "pages": 2}
+    assert bench.crawl_jobs("recall", keys) == [(kwargs, keys)]
+
+
+def test_percentile_is_exact():
+    values = [i / 1000 for i in range(1, 101)]
+    assert bench.percentile(values, 0.5) == pytest.approx(0.0505)
+    assert bench.percentile(values, 0.99) == pytest.approx(0.09901)
+    assert bench.percentile([0.2], 0.99) == 0.2
+    assert bench.percentile([], 0.5) == 0.0
@@ -0,0 +1,89 @@
+import asyncio
+import time
+from pathlib import Path
+
+import pytest
+
+from car_crawler import sales
+from car_crawler.cli import build_parser, in_page_order, run_zlts_incremental, save_pages
+from car_crawler.fetcher import AsyncFetcher
+from car_crawler.metrics import REGISTRY
+from car_crawler.seen_index import SeenIndex
+from car_crawler.writers import ChunkedWriter, iter_column
+from tests.stub import stub_server
+from tests.test_incremental import Site
+
+
+def test_in_page_order_skips_failed_pages_without_buffering():
+    arrived = []
+
+    async def pages():
+        for page, rows in [(2, ["b"]), (3, ["c"]), (1, None), (5, ["e"]), (4, None)]:
+            arrived.append(page)
+            yield page, rows
+
+    async def run():
+        # 记录每页产出时已到达的页，确认失败页一到就放行后面缓存的页
+        return [(page, rows, list(arrived)) async for page, rows in in_page_order(pages())]
+
+    assert asyncio.run(run()) == [
+        (2, ["b"], [2, 3, 1]),
+        (3, ["c"], [2, 3, 1]),
+        (5, ["e"], [2, 3, 1, 5, 4]),
+    ]
+
+
+def test_incremental_parquet_parts_are_readable_before_ids_are_recorded(tmp_path, monkeypatch):
+    pq = pytest.importorskip("pyarrow.parquet")
+    monkeypatch.chdir(tmp_path)
+    args = build_parser().parse_args(
+        ["zlts", "--incremental", "--format", "parquet", "--pages", "3", "--no-cache"]
+    )
+    out = Path("out") / "投诉"
+    recorded = []
+    add = SeenIndex.add
+
+    def add_after_crash_check(self, scope, ids):
+        # 模拟进程在记录编号前被杀：此刻磁盘上的每个分片都必须完整可读，且包含这些编号
+        on_disk = {
+            value
+            for part in out.rglob("*.parquet")
+            for value in pq.read_table(part).column("投诉编号").to_pylist()
+        }
+        assert set(ids) <= on_disk
+        recorded.extend(ids)
+        add(self, scope, ids)
+
+    monkeypatch.setattr(SeenIndex, "add", add_after_crash_check)
+    site = Site(newest=12)
+
+    async def run():
+        async with stub_server(site.handler) as base, AsyncFetcher(rate=0, retries=0) as fetcher:
+            await run_zlts_incremental(args, fetcher, base)
+
+    asyncio.run(run())
+    assert sorted(recorded, key=int) == [str(i) for i in range(1, 13)]
+    # 结束后每页一个的分片合并为一个文件
+    assert len(list(out.rglob("part-*.parquet"))) == 1
+    assert sorted(iter_column(out, "投诉编号"), key=int) == sorted(recorded, key=int)
+
+
+def test_save_pages_times_the_final_flush_on_close(tmp_path, monkeypatch):
+    monkeypatch.chdir(tmp_path)
+    args = build_parser().parse_args(["sales"])
+    close = ChunkedWriter.close
+
+    def slow_close(self):
+        time.sleep(0.05)
+        close(self)
+
+    monkeypatch.setattr(ChunkedWriter, "close", slow_close)
+
+    async def pages():
+        for page in (1, 2):
+            yield page, [sales.SalesRow(*[""] * len(sales.FIELDS))]
+
+    REGISTRY.reset()
+    path, count = asyncio.run(save_pages(args, pages(), sales, "销量排行"))
+    assert count == 2 and path.exists()
+    assert REGISTRY.histogram("write_seconds").sum >= 0.05
@@ -0,0 +1,43 @@
+import asyncio
+
+from aiohttp import web
+
+from car_crawler.details import DetailEnricher, DetailStore
+from car_crawler.fetcher import AsyncFetcher
+from tests.stub import stub_server
+
+PAGES = {
+    "/ok": '<div class="tsnr">刹车异响</div><div class="hfnr">已处理</div>',
+    "/captcha": "<html><body>请输入验证码<script>var x=1</script></body></html>",
+}
+
+
+def test_details_without_content_are_not_stored_and_retried(tmp_path):
+    pages = dict(PAGES)
+    broken = {"/down"}
+
+    async def handler(request):
+        if request.path in broken:
+            return web.Response(status=503)
+        html = pages.get(request.path, pages["/ok"])
+        return web.Response(text=html, content_type="text/html")
+
+    async def run(store):
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, retries=0) as fetcher:
+            enricher = DetailEnricher(fetcher, store, "zlts")
+            paths = ("/ok", "/captcha", "/down")
+            rows = [{"投诉编号": path, "详情链接": base + path} for path in paths]
+            enriched = await enricher.enrich(rows)
+            return enriched, {url.removeprefix(base) for url in enricher.failed}
+
+    with DetailStore(tmp_path / "details.sqlite3") as store:
+        rows, failed = asyncio.run(run(store))
+        assert [row["投诉内容"] for row in rows] == ["刹车异响", "", ""]
+        assert failed == {"/captcha", "/down"}
+        assert store.conn.execute("SELECT COUNT(*) FROM pages").fetchone() == (1,)
+
+        broken.clear()
+        pages["/captcha"] = '<div class="tsnr">车机黑屏</div>'
+        rows, failed = asyncio.run(run(store))
+        assert [row["投诉内容"] for row in rows] == ["刹车异响", "车机黑屏", "刹车异响"]
+        assert failed == set()
@@ -0,0 +1,265 @@
+import asyncio
+import sqlite3
+import time
+from contextlib import aclosing
+
+import pytest
+from aiohttp import web
+
+from car_crawler.fetcher import AsyncFetcher
+from car_crawler.http_cache import ResponseCache
+from tests.stub import stub_server
+
+
+def test_fetch_many_yields_in_completion_order():
+    delays = {"/slow": 0.3, "/mid": 0.15, "/fast": 0.0}
+
+    async def handler(request):
+        await asyncio.sleep(delays[request.path])
+        return web.Response(text=request.path)
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0) as fetcher:
+            urls = [(base + path, path) for path in delays]
+            return [result.meta async for result in fetcher.fetch_many(urls)]
+
+    assert asyncio.run(run()) == ["/fast", "/mid", "/slow"]
+
+
+def test_fetch_many_cancels_pending_requests_on_early_exit():
+    finished = []
+
+    async def handler(request):
+        if request.path != "/fast":
+            await asyncio.sleep(2)
+        finished.append(request.path)
+        return web.Response(text="ok")
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0) as fetcher:
+            urls = [base + path for path in ("/slow1", "/fast", "/slow2")]
+            start = time.monotonic()
+            async with aclosing(fetcher.fetch_many(urls)) as results:
+                async for result in results:
+                    assert result.ok
+                    break
+            # 服务器关闭时会等待处理函数结束，所以在这里取快照
+            return time.monotonic() - start, list(finished)
+
+    elapsed, done = asyncio.run(run())
+    assert elapsed < 1
+    assert done == ["/fast"]
+
+
+def test_fetch_many_limits_requests_in_flight():
+    in_flight = []
+    peak = []
+
+    async def handler(request):
+        in_flight.append(request.path)
+        peak.append(len(in_flight))
+        await asyncio.sleep(0.05)
+        in_flight.remove(request.path)
+        return web.Response(text="ok")
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(concurrency=3, rate=0) as fetcher:
+            return [r async for r in fetcher.fetch_many(f"{base}/{i}" for i in range(10))]
+
+    assert len(asyncio.run(run())) == 10
+    assert max(peak) == 3
+
+
+def test_retries_5xx_with_backoff_then_succeeds():
+    hits = []
+
+    async def handler(request):
+        hits.append(time.monotonic())
+        if len(hits) < 3:
+            return web.Response(status=503)
+        return web.Response(text="ok")
+
+    async def run():
+        async with stub_server(handler) as base:
+            async with AsyncFetcher(rate=0, retries=3, backoff=0.05) as fetcher:
+                return await fetcher.fetch(base + "/")
+
+    result = asyncio.run(run())
+    assert result.ok and result.text == "ok"
+    assert result.attempts == 3
+    # 第二次重试的间隔至少是 backoff * 2
+    assert hits[2] - hits[1] >= 0.1
+    # request_seconds 只算最后一次请求，不含退避等待
+    assert result.request_seconds < 0.1 <= result.elapsed
+
+
+def test_gives_up_after_retries():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(status=500)
+
+    async def run():
+        async with stub_server(handler) as base:
+            async with AsyncFetcher(rate=0, retries=2, backoff=0.01) as fetcher:
+                return await fetcher.fetch(base + "/")
+
+    result = asyncio.run(run())
+    assert not result.ok
+    assert result.error == "HTTP 500"
+    assert result.attempts == 3 and len(hits) == 3
+
+
+def test_429_honours_retry_after():
+    hits = []
+
+    async def handler(request):
+        hits.append(time.monotonic())
+        if len(hits) == 1:
+            return web.Response(status=429, headers={"Retry-After": "1"})
+        return web.Response(text="ok")
+
+    async def run():
+        async with stub_server(handler) as base:
+            async with AsyncFetcher(rate=0, retries=1, backoff=0.01) as fetcher:
+                return await fetcher.fetch(base + "/")
+
+    assert asyncio.run(run()).ok
+    assert hits[1] - hits[0] >= 0.95
+
+
+def test_client_errors_are_not_retried():
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(status=404)
+
+    async def run():
+        async with stub_server(handler) as base:
+            async with AsyncFetcher(rate=0, retries=3, backoff=0.01) as fetcher:
+                return await fetcher.fetch(base + "/missing")
+
+    result = asyncio.run(run())
+    assert not result.ok and result.status == 404 and result.error is None
+    assert len(hits) == 1
+
+
+def test_rate_limit_is_per_host():
+    arrivals: dict[str, list[float]] = {"a": [], "b": []}
+
+    def handler_for(name):
+        async def handler(request):
+            arrivals[name].append(time.monotonic())
+            return web.Response(text="ok")
+
+        return handler
+
+    async def run():
+        async with stub_server(handler_for("a")) as a, stub_server(handler_for("b")) as b:
+            async with AsyncFetcher(concurrency=8, rate=10) as fetcher:
+                urls = [f"{host}/{i}" for i in range(4) for host in (a, b)]
+                start = time.monotonic()
+                async for result in fetcher.fetch_many(urls):
+                    assert result.ok
+                return time.monotonic() - start
+
+    elapsed = asyncio.run(run())
+    for times in arrivals.values():
+        gaps = [later - earlier for earlier, later in zip(times, times[1:])]
+        assert min(gaps) >= 0.08
+    # 两个主机各自限速，并行进行：约 0.3 秒而不是 0.7 秒
+    assert elapsed < 0.6
+
+    async def run_queued():
+        async with stub_server(handler_for("a")) as a, stub_server(handler_for("b")) as b:
+            async with AsyncFetcher(concurrency=2, rate=5) as fetcher:
+                # 主机 a 排队的请求多于并发数，主机 b 的请求不应等它们
+                throttled = [asyncio.ensure_future(fetcher.fetch(f"{a}/{i}")) for i in range(6)]
+                await asyncio.sleep(0.05)
+                start = time.monotonic()
+                assert (await fetcher.fetch(b + "/")).ok
+                elapsed = time.monotonic() - start
+                await asyncio.gather(*throttled)
+                return elapsed
+
+    assert asyncio.run(run_queued()) < 0.15
+
+
+def test_cache_serves_fresh_responses_and_is_closed_on_exit(tmp_path):
+    hits = []
+
+    async def handler(request):
+        hits.append(request.path)
+        return web.Response(text="cached")
+
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, cache=cache) as fetcher:
+            first = await fetcher.fetch(base + "/page", ttl=60)
+            second = await fetcher.fetch(base + "/page", ttl=60)
+        return first, second
+
+    first, second = asyncio.run(run())
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.text == "cached"
+    assert hits == ["/page"]
+    with pytest.raises(sqlite3.ProgrammingError):
+        cache.get("/page")
+
+
+def test_stale_entries_are_revalidated_and_304_reuses_the_body(tmp_path):
+    seen_headers = []
+
+    async def handler(request):
+        seen_headers.append(
+            (request.headers.get("If-None-Match"), request.headers.get("If-Modified-Since"))
+        )
+        if request.headers.get("If-None-Match") == '"v1"':
+            return web.Response(status=304)
+        return web.Response(
+            text="body",
+            headers={"ETag": '"v1"', "Last-Modified": "Wed, 01 Jan 2025 00:00:00 GMT"},
+        )
+
+    cache = ResponseCache(tmp_path / "cache.sqlite3")
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, cache=cache) as fetcher:
+            first = await fetcher.fetch(base + "/page", ttl=0)
+            stored_at = cache.get(base + "/page").stored_at
+            time.sleep(0.01)
+            second = await fetcher.fetch(base + "/page", ttl=0)
+            return first, second, stored_at, cache.get(base + "/page").stored_at
+
+    first, second, before, after = asyncio.run(run())
+    assert seen_headers == [
+        (None, None),
+        ('"v1"', "Wed, 01 Jan 2025 00:00:00 GMT"),
+    ]
+    assert (first.from_cache, second.from_cache) == (False, True)
+    assert second.status == 200 and second.text == "body"
+    assert after > before
+
+
+def test_cache_evicts_least_recently_used_entries(tmp_path):
+    async def handler(request):
+        return web.Response(body=b"x" * 100)
+
+    cache = ResponseCache(tmp_path / "cache.sqlite3", max_bytes=250)
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, cache=cache) as fetcher:
+            for path in ("/a", "/b", "/a", "/c"):
+                await fetcher.fetch(base + path, ttl=60)
+                time.sleep(0.01)
+            return {
+                path: cache.get(base + path) is not None for path in ("/a", "/b", "/c")
+            }, cache.total_bytes()
+
+    present, total = asyncio.run(run())
+    # /a 在 /c 写入前刚被访问过，所以淘汰的是 /b
+    assert present == {"/a": True, "/b": False, "/c": True}
+    assert total == 200
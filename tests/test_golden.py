@@ -0,0 +1,34 @@
+import json
+
+import pytest
+
+from car_crawler import golden, zlts
+from car_crawler.parsing import PARSERS, parse_html, text_of
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+@pytest.mark.parametrize("path", golden.fixtures(), ids=lambda path: path.stem)
+def test_parser_matches_golden(path, parser):
+    expected = json.loads(path.with_suffix(".json").read_text(encoding="utf-8"))
+    assert golden.parse_fixture(path, parser) == expected
+
+
+def test_text_of_skips_scripts_styles_and_comments():
+    root = parse_html("<p> A <script>var x=1</script><!-- c --><b>B</b><style>b{}</style> C</p>")
+    assert text_of(root.find(".//p")) == "ABC"
+
+
+@pytest.mark.parametrize("parser", PARSERS)
+def test_decoded_page_with_xml_encoding_declaration(parser):
+    html = (
+        '<?xml version="1.0" encoding="gbk"?>\n'
+        '<html><head><meta http-equiv="Content-Type" content="text/html; charset=gbk" /></head>'
+        '<body><div class="tslb_b"><table><tr><td>1</td><td>小鹏</td><td>小鹏P7</td>'
+        '<td>2024款</td><td><a href="/zlts/1.shtml">异响</a></td><td>车身</td>'
+        "<td>2025-01-01</td><td>处理中</td></tr></table></div></body></html>"
+    )
+    assert text_of(parse_html(html).find(".//td")) == "1"
+    rows = zlts.parse_list_page(html, parser=parser)
+    assert [(row["投诉编号"], row["投诉车系"], row["详情链接"]) for row in rows] == [
+        ("1", "小鹏P7", "https://www.12365auto.com/zlts/1.shtml")
+    ]
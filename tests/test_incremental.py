@@ -0,0 +1,110 @@
+import asyncio
+import re
+
+from aiohttp import web
+
+from car_crawler import zlts
+from car_crawler.fetcher import AsyncFetcher
+from car_crawler.seen_index import SeenIndex, scope_key
+from tests.stub import stub_server
+
+PER_PAGE = 5
+
+
+class Site:
+    """按编号倒序分页的投诉列表，可以让指定页返回 503。"""
+
+    def __init__(self, newest: int):
+        self.newest = newest
+        self.broken: set[int] = set()
+        self.requested: list[int] = []
+
+    async def handler(self, request):
+        page = int(re.search(r"-(\d+)\.shtml$", request.path).group(1))
+        self.requested.append(page)
+        if page in self.broken:
+            return web.Response(status=503)
+        first = self.newest - (page - 1) * PER_PAGE
+        rows = "".join(
+            f'<tr><td>{i}</td><td>品牌</td><td>车系</td><td>车型</td>'
+            f'<td><a href="/zlts/{i}.shtml">问题</a></td><td>故障</td>'
+            f"<td>2025-01-01</td><td>处理中</td></tr>"
+            for i in range(first, max(first - PER_PAGE, 0), -1)
+        )
+        return web.Response(
+            text=f'<div class="tslb_b"><table>{rows}</table></div>', content_type="text/html"
+        )
+
+
+def crawl(site: Site, index: SeenIndex, pages: int = 10, series: int = 0) -> dict[int, list[str]]:
+    """像命令行增量模式那样抓取：每页产出后记录编号，返回 页码 -> 新编号。"""
+
+    async def run():
+        found = {}
+        async with stub_server(site.handler) as base, AsyncFetcher(
+            concurrency=3, rate=0, retries=0
+        ) as fetcher:
+            async for page, rows in zlts.crawl_new(
+                fetcher, index, 1, series, 0, pages, base
+            ):
+                ids = [row["投诉编号"] for row in rows]
+                found[page] = ids
+                index.add(scope_key(1, series, 0), ids)
+        return found
+
+    return asyncio.run(run())
+
+
+def ids(first: int, last: int) -> list[str]:
+    return [str(i) for i in range(first, last - 1, -1)]
+
+
+def test_stops_at_first_known_complaint(tmp_path):
+    site = Site(newest=20)
+    with SeenIndex(tmp_path / "seen.sqlite3") as index:
+        assert crawl(site, index) == {1: ids(20, 16), 2: ids(15, 11), 3: ids(10, 6), 4: ids(5, 1)}
+        site.newest = 27
+        site.requested.clear()
+        assert crawl(site, index) == {1: ids(27, 23), 2: ids(22, 21)}
+        # 第 2 页出现已见投诉，同批的第 3 页已请求，但不再请求下一批
+        assert sorted(site.requested) == [1, 2, 3]
+        # 第 1 页已全部见过时只请求这一页
+        site.requested.clear()
+        assert crawl(site, index) == {}
+        assert site.requested == [1]
+
+
+def test_unseen_complaints_below_high_water_are_kept(tmp_path):
+    site = Site(newest=20)
+    with SeenIndex(tmp_path / "seen.sqlite3") as index:
+        # 编号较大的投诉已记录，但 20..16 从未见过：照常产出，只在这一页停止
+        index.add(scope_key(1, 0, 0), ["100"])
+        assert crawl(site, index) == {1: ids(20, 16)}
+        assert site.requested == [1]
+
+
+def test_failed_page_stops_crawl_and_next_run_fills_the_gap(tmp_path):
+    site = Site(newest=20)
+    site.broken.add(2)
+    with SeenIndex(tmp_path / "seen.sqlite3") as index:
+        # 第 3 页与失败的第 2 页同批抓到，但不能越过缺页产出或记录
+        assert crawl(site, index) == {1: ids(20, 16)}
+        assert not index.complete(scope_key(1, 0, 0))
+
+        site.broken.clear()
+        assert crawl(site, index) == {2: ids(15, 11), 3: ids(10, 6), 4: ids(5, 1)}
+        assert index.complete(scope_key(1, 0, 0))
+
+        site.newest = 22
+        assert crawl(site, index) == {1: ids(22, 21)}
+
+
+def test_scopes_are_independent(tmp_path):
+    site = Site(newest=10)
+    with SeenIndex(tmp_path / "seen.sqlite3") as index:
+        assert crawl(site, index) == {1: ids(10, 6), 2: ids(5, 1)}
+        # 先抓过品牌，其下车系的第一次增量抓取仍应得到完整历史
+        assert crawl(site, index, series=5) == {1: ids(10, 6), 2: ids(5, 1)}
+        assert index.seen(scope_key(1, 5, 0), ["10", "1"]) == {"10", "1"}
+        assert index.seen(scope_key(1, 6, 0), ["10", "1"]) == set()
+
@@ -0,0 +1,74 @@
+import pickle
+import urllib.error
+import urllib.request
+
+import pytest
+
+from car_crawler.metrics import Metrics, serve
+
+
+def sample() -> Metrics:
+    metrics = Metrics()
+    metrics.inc("http_responses_total", status="200", host="a")
+    metrics.inc("http_responses_total", 2, status="200", host="a")
+    metrics.inc("rows_parsed_total", 30)
+    for value in (0.003, 0.02, 0.02, 40.0):
+        metrics.observe("http_request_seconds", value, host="a")
+    return metrics
+
+
+def test_prometheus_counters_and_cumulative_buckets():
+    lines = sample().prometheus().splitlines()
+    assert "# TYPE car_crawler_http_responses_total counter" in lines
+    # 标签按名称排序
+    assert 'car_crawler_http_responses_total{host="a",status="200"} 3' in lines
+    assert "car_crawler_rows_parsed_total 30" in lines
+
+    assert "# TYPE car_crawler_http_request_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith("car_crawler_http_request_seconds_bucket")]
+    counts = {line.split('le="')[1].split('"')[0]: int(line.rsplit(" ", 1)[1]) for line in buckets}
+    assert buckets[0].startswith('car_crawler_http_request_seconds_bucket{host="a",le="0.001"}')
+    assert counts["0.001"] == 0
+    assert counts["0.005"] == 1
+    assert counts["0.025"] == 3
+    assert counts["30"] == 3
+    assert counts["+Inf"] == 4
+    assert list(counts.values()) == sorted(counts.values())
+    assert 'car_crawler_http_request_seconds_sum{host="a"} 40.043' in lines
+    assert 'car_crawler_http_request_seconds_count{host="a"} 4' in lines
+
+
+def test_snapshot_merges_into_another_registry():
+    worker = sample()
+    main = Metrics()
+    main.inc("rows_parsed_total", 5)
+    main.observe("http_request_seconds", 0.2, host="b")
+
+    # 工作进程的快照要经过 pickle 交回主进程
+    main.merge(pickle.loads(pickle.dumps(worker.snapshot())))
+    main.merge(worker.snapshot())
+
+    assert main.total("rows_parsed_total") == 65
+    assert main.total("http_responses_total") == 6
+    summary = main.summary()["histograms"]["http_request_seconds"]
+    assert summary["host=a"]["count"] == 8
+    assert summary["host=a"]["sum"] == pytest.approx(80.086)
+    assert summary["host=b"]["count"] == 1
+    assert main.histogram("http_request_seconds").count == 9
+
+
+def test_serve_exposes_metrics_endpoint():
+    metrics = sample()
+    server = serve(0, metrics)
+    try:
+        base = f"http://127.0.0.1:{server.server_address[1]}"
+        with urllib.request.urlopen(base + "/metrics") as response:
+            assert response.status == 200
+            assert response.headers["Content-Type"].startswith("text/plain; version=0.0.4")
+            assert response.read().decode() == metrics.prometheus()
+        with pytest.raises(urllib.error.HTTPError) as excinfo:
+            urllib.request.urlopen(base + "/other")
+        assert excinfo.value.code == 404
+    finally:
+        server.shutdown()
+        server.server_close()
@@ -0,0 +1,102 @@
+import asyncio
+import re
+
+from aiohttp import web
+
+from car_crawler import sweep
+from car_crawler.fetcher import AsyncFetcher
+from car_crawler.writers import iter_column
+from tests.stub import stub_server, threaded_stub_server
+
+# 车系 -> 第 1 页的投诉编号；不同车系的列表有重叠，第 2 页起为空
+LISTINGS = {1: [5, 4, 3], 2: [3, 2, 1], 3: [9, 8]}
+
+
+def list_handler(requested: list[str]):
+    async def handler(request):
+        series, page = re.search(r"/zlts/\d+-(\d+)-\d+-.*-(\d+)\.shtml$", request.path).groups()
+        requested.append(f"{series}:{page}")
+        ids = LISTINGS[int(series)] if page == "1" else []
+        rows = "".join(
+            f"<tr><td>{i}</td><td>品牌</td><td>车系{series}</td><td>车型</td>"
+            f'<td><a href="/zlts/{i}.shtml">问题</a></td><td>故障</td>'
+            f"<td>2025-01-01</td><td>处理中</td></tr>"
+            for i in ids
+        )
+        return web.Response(
+            text=f'<div class="tslb_b"><table>{rows}</table></div>', content_type="text/html"
+        )
+
+    return handler
+
+
+def test_failed_lookups_are_reported_and_skipped():
+    async def handler(request):
+        if request.path.endswith("getBrand.ashx"):
+            return web.json_response([{"id": 1, "name": "甲"}, {"id": 2, "name": "乙"}])
+        if request.query["bid"] == "1":
+            return web.json_response([{"id": 10, "name": "A"}, {"id": 11, "name": "B"}])
+        # 品牌 2 的车系查询失败
+        return web.Response(status=500)
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, retries=0) as fetcher:
+            return await sweep.build_work_list(fetcher, "series", base_url=base)
+
+    items, failed = asyncio.run(run())
+    assert [item.key for item in items] == ["1-10-0", "1-11-0"]
+    assert failed == ["乙"]
+
+
+def test_empty_lookup_body_does_not_abort_work_list():
+    async def handler(request):
+        if request.path.endswith("getBrand.ashx"):
+            return web.json_response([{"id": 1, "name": "甲"}])
+        if request.path.endswith("getSeries.ashx"):
+            return web.json_response([{"id": 10, "name": "A"}, {"id": 11, "name": "B"}])
+        if request.query["sid"] == "10":
+            return web.json_response([{"id": 100, "name": "2024款"}])
+        return web.Response(text="")
+
+    async def run():
+        async with stub_server(handler) as base, AsyncFetcher(rate=0, retries=0) as fetcher:
+            return await sweep.build_work_list(fetcher, "model", base_url=base)
+
+    items, failed = asyncio.run(run())
+    assert [(item.key, item.label) for item in items] == [("1-10-100", "甲/A/2024款")]
+    assert failed == ["甲/B"]
+
+
+def test_checkpoint_round_trip(tmp_path):
+    path = tmp_path / "checkpoint.json"
+    assert sweep.Checkpoint.load(path) is None
+    checkpoint = sweep.Checkpoint(path, tmp_path / "投诉", 3, "model", "jsonl", ["brand"])
+    checkpoint.done = {"1-2-0", "1-1-0"}
+    checkpoint.save()
+
+    loaded = sweep.Checkpoint.load(path)
+    assert (loaded.output, loaded.pages, loaded.level) == (tmp_path / "投诉", 3, "model")
+    assert (loaded.fmt, loaded.partition_by, loaded.done) == ("jsonl", ["brand"], checkpoint.done)
+    assert not path.with_suffix(".tmp").exists()
+
+
+def test_run_sweep_skips_done_items_and_dedups_across_chunks(tmp_path):
+    requested: list[str] = []
+    checkpoint = sweep.Checkpoint(tmp_path / "checkpoint.json", tmp_path / "投诉", 2, "series")
+    # 车系 3 上次已完成
+    checkpoint.done = {"1-3-0"}
+    items = [sweep.WorkItem(1, series) for series in LISTINGS]
+
+    with threaded_stub_server(list_handler(requested)) as base:
+        options = sweep.FetchOptions(concurrency=2, rate=0, retries=0, base_url=base)
+        # 每块一个工作项：车系 1 和 2 的重叠编号由不同块交回
+        written = sweep.run_sweep(items, checkpoint, options, workers=1, chunk_size=1)
+        assert written == 5
+        assert sorted(iter_column(checkpoint.target, "投诉编号")) == ["1", "2", "3", "4", "5"]
+        assert sorted(requested) == ["1:1", "1:2", "2:1", "2:2"]
+        assert sweep.Checkpoint.load(checkpoint.path).done == {"1-1-0", "1-2-0", "1-3-0"}
+
+        # 再次运行：全部已完成，不再发请求
+        requested.clear()
+        assert sweep.run_sweep(items, checkpoint, options, workers=1, chunk_size=1) == 0
+        assert requested == []
@@ -0,0 +1,42 @@
+import csv
+
+import pytest
+
+from car_crawler.writers import PartitionedWriter, compact_parquet, iter_column, open_writer
+
+FIELDS = ["投诉编号", "投诉品牌", "投诉时间"]
+
+
+def rows(brands, start=0):
+    return [
+        {"投诉编号": str(start + i), "投诉品牌": brand, "投诉时间": "2025-01-02"}
+        for i, brand in enumerate(brands)
+    ]
+
+
+def test_partitioned_writer_closes_least_recently_used(tmp_path):
+    writer = PartitionedWriter(
+        tmp_path / "out", "csv", FIELDS, "投诉品牌", "投诉时间", ["brand"], chunk_rows=1, max_open=2
+    )
+    with writer:
+        writer.write(rows(["甲", "乙", "甲", "丙", "乙"]))
+        assert list(writer._writers) == [("brand=丙",), ("brand=乙",)]
+    with open(tmp_path / "out" / "brand=乙" / "part.csv", newline="", encoding="utf-8-sig") as f:
+        assert [row["投诉编号"] for row in csv.DictReader(f)] == ["1", "4"]
+    assert sorted(iter_column(tmp_path / "out", "投诉编号")) == ["0", "1", "2", "3", "4"]
+
+
+def test_compact_parquet_merges_parts_per_directory(tmp_path):
+    pytest.importorskip("pyarrow")
+    out = tmp_path / "out"
+    for start in (0, 10, 20):
+        with open_writer(
+            out, "parquet", FIELDS, "投诉品牌", "投诉时间", ["brand"], append=True
+        ) as writer:
+            writer.write(rows(["甲", "乙"], start))
+
+    assert len(list(out.rglob("part-*.parquet"))) == 6
+    assert compact_parquet(out, row_group_rows=2) == 4
+    assert len(list(out.rglob("part-*.parquet"))) == 2
+    assert sorted(iter_column(out, "投诉编号"), key=int) == ["0", "1", "10", "11", "20", "21"]
+    assert compact_parquet(out) == 0